@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
 from core.config import settings
-from .api_v1 import router as router_api_v1
+from .api_v1 import router as router_api_v1, upload_rules as api_v1_upload_rules
 
 router = APIRouter()
 
 router.include_router(router_api_v1)
+
+upload_rules = {
+    f"{settings.api.prefix}{path}": rules for path, rules in api_v1_upload_rules.items()
+}
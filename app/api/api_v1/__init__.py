@@ -2,12 +2,21 @@ from fastapi import APIRouter
 
 from core.config import settings
 
-from .migration_service import router as migration_service_router
-from .ukrainian_pension_fund import router as ukrainian_pension_fund_router
+from .migration_service import (
+    router as migration_service_router,
+    upload_rules as migration_service_upload_rules,
+)
+from .ukrainian_pension_fund import (
+    router as ukrainian_pension_fund_router,
+    upload_rules as ukrainian_pension_fund_upload_rules,
+)
 from .main_service_center_mvs_ukraine import (
     router as main_service_center_mvs_ukraine_router,
+    upload_rules as main_service_center_mvs_ukraine_upload_rules,
 )
 from .healthcheck import router as healthcheck_router
+from .metrics import router as metrics_router
+from .debug import router as debug_router
 
 router = APIRouter(prefix=settings.api.v1.prefix)
 
@@ -22,3 +31,11 @@ router.include_router(
     prefix=settings.api.v1.main_service_center_mvs_ukraine,
 )
 router.include_router(healthcheck_router, prefix=settings.api.v1.healthcheck)
+router.include_router(metrics_router, prefix=settings.api.v1.metrics)
+router.include_router(debug_router, prefix=settings.api.v1.debug)
+
+upload_rules = {
+    f"{settings.api.v1.prefix}{settings.api.v1.migration_service}/": migration_service_upload_rules,
+    f"{settings.api.v1.prefix}{settings.api.v1.ukrainian_pension_fund}/": ukrainian_pension_fund_upload_rules,
+    f"{settings.api.v1.prefix}{settings.api.v1.main_service_center_mvs_ukraine}/": main_service_center_mvs_ukraine_upload_rules,
+}
@@ -0,0 +1,64 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.exceptions import (
+    ApplicationException,
+    DebugAccessDeniedException,
+    ProfileNotFoundException,
+)
+from core.debug import has_debug_access
+from core.profiling import list_profiles, read_profile
+from utils.memory_profiler import read_memory_profiles
+
+router = APIRouter(tags=["Debug"])
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/memory")
+def get_memory_profiles(
+    limit: int = Query(20, ge=1, le=500),
+    debug_token: Optional[str] = Header(None, alias="X-Debug-Token"),
+):
+    try:
+        if not has_debug_access(debug_token):
+            raise DebugAccessDeniedException()
+
+        return read_memory_profiles(settings.memory_profiling.export_path, limit)
+    except ApplicationException as e:
+        return e.to_json_response()
+
+
+@router.get("/profiles")
+def get_profiles(
+    debug_token: Optional[str] = Header(None, alias="X-Debug-Token"),
+):
+    try:
+        if not has_debug_access(debug_token):
+            raise DebugAccessDeniedException()
+
+        return list_profiles()
+    except ApplicationException as e:
+        return e.to_json_response()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    debug_token: Optional[str] = Header(None, alias="X-Debug-Token"),
+):
+    try:
+        if not has_debug_access(debug_token):
+            raise DebugAccessDeniedException()
+
+        collapsed_stacks = read_profile(profile_id)
+        if collapsed_stacks is None:
+            raise ProfileNotFoundException(profile_id=profile_id)
+
+        return PlainTextResponse(collapsed_stacks)
+    except ApplicationException as e:
+        return e.to_json_response()
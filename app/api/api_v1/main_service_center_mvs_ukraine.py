@@ -5,13 +5,20 @@ from fastapi import APIRouter, UploadFile, File, Depends
 
 from core.dependencies import get_main_service_center_mvs_ukraine
 from core.exceptions import ApplicationException
+from core.metrics import record_error
 from core.schemas.main_service_center_mvs_ukraine import (
     MainServiceCenterMVSUkrainePersonInfo,
 )
 from services.main_service_center_mvs_ukraine import MainServiceCenterMVSUkraine
+from utils.validate_file import UploadRule
 
 router = APIRouter(tags=["Main Service Center MVS Ukraine"])
 
+upload_rules = {
+    "driverLicenseFile": UploadRule(allowed_extensions=[".xls"], max_size_mb=5),
+    "carInfoFile": UploadRule(allowed_extensions=[".xls"], max_size_mb=5),
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +34,9 @@ async def parse(
         )
         return result
     except ApplicationException as e:
+        record_error("main_service_center_mvs_ukraine", e)
         return e.to_json_response()
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+        record_error("main_service_center_mvs_ukraine", e)
         return ApplicationException().to_json_response()
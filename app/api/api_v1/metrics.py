@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from core.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/")
+def get_metrics() -> Response:
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
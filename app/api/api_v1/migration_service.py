@@ -1,27 +1,70 @@
 import logging
 
-from fastapi import APIRouter, UploadFile, File, Depends
+from typing import Literal, Optional
+
+from fastapi import APIRouter, UploadFile, File, Depends, Form
 
 from core.dependencies import get_migration_service
 from core.exceptions import ApplicationException
-from core.schemas.migration_service import MigrationServicePersonInfo
+from core.metrics import record_error
+from core.responses import Base64StreamingJSONResponse
+from core.schemas.migration_service import (
+    MigrationServiceImageOptions,
+    MigrationServicePersonInfo,
+)
 from services.migration_service import MigrationService
+from utils.validate_file import UploadRule
 
 router = APIRouter(tags=["Migration Service"])
 
+upload_rules = {
+    "personalInfoFile": UploadRule(allowed_extensions=[".pdf"], max_size_mb=5),
+}
+
+INCLUDE_PATTERN = r"^(fields|image|cleanedFile)(,(fields|image|cleanedFile))*$"
+
 logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=MigrationServicePersonInfo)
 async def parse(
     personal_info_file: UploadFile = File(..., alias="personalInfoFile"),
+    image_max_width: Optional[int] = Form(None, alias="imageMaxWidth", gt=0),
+    image_max_height: Optional[int] = Form(None, alias="imageMaxHeight", gt=0),
+    image_format: Optional[Literal["jpeg", "webp"]] = Form(None, alias="imageFormat"),
+    image_quality: Optional[int] = Form(None, alias="imageQuality", ge=1, le=100),
+    include: Optional[str] = Form(None, alias="include", pattern=INCLUDE_PATTERN),
     service: MigrationService = Depends(get_migration_service),
 ):
+    outputs = set(include.split(",")) if include else {"image", "cleanedFile"}
+
     try:
-        result = await service.process(personal_info_file)
-        return result
+        result = await service.process(
+            personal_info_file,
+            image_options=MigrationServiceImageOptions(
+                max_width=image_max_width,
+                max_height=image_max_height,
+                format=image_format,
+                quality=image_quality,
+            ),
+            include_image="image" in outputs,
+            include_cleaned_file="cleanedFile" in outputs,
+        )
+        return Base64StreamingJSONResponse(
+            result.person,
+            binary_fields={
+                key: value
+                for key, value in (
+                    ("image", result.image),
+                    ("cleanedFile", result.cleaned_file),
+                )
+                if value is not None
+            },
+        )
     except ApplicationException as e:
+        record_error("migration_service", e)
         return e.to_json_response()
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+        record_error("migration_service", e)
         return ApplicationException().to_json_response()
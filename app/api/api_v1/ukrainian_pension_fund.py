@@ -4,11 +4,17 @@ from fastapi import APIRouter, UploadFile, File, Depends
 
 from core.dependencies import get_ukrainian_pension_fund_service
 from core.exceptions import ApplicationException
+from core.metrics import record_error
 from core.schemas.ukrainian_pension_fund import UkrainianPensionFundPersonInfo
 from services.ukrainian_pension_fund import UkrainianPensionFundService
+from utils.validate_file import UploadRule
 
 router = APIRouter(tags=["Ukrainian Pension Fund"])
 
+upload_rules = {
+    "personalIncomeFile": UploadRule(allowed_extensions=[".xml"], max_size_mb=5),
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +27,9 @@ async def parse(
         result = await service.process(personal_income_file)
         return result
     except ApplicationException as e:
+        record_error("ukrainian_pension_fund", e)
         return e.to_json_response()
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+        record_error("ukrainian_pension_fund", e)
         return ApplicationException().to_json_response()
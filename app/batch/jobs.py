@@ -0,0 +1,110 @@
+import base64
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from api.api_v1.main_service_center_mvs_ukraine import (
+    upload_rules as main_service_center_mvs_ukraine_upload_rules,
+)
+from api.api_v1.migration_service import (
+    upload_rules as migration_service_upload_rules,
+)
+from api.api_v1.ukrainian_pension_fund import (
+    upload_rules as ukrainian_pension_fund_upload_rules,
+)
+from core.exceptions import NoFilePresentedException
+from services.main_service_center_mvs_ukraine import MainServiceCenterMVSUkraine
+from services.migration_service import MigrationService
+from services.ukrainian_pension_fund import UkrainianPensionFundService
+from utils.validate_file import (
+    UploadedFile,
+    UploadRule,
+    validate_file_extension,
+    validate_file_signature,
+    validate_file_size,
+)
+
+
+@dataclass
+class BatchItem:
+    id: str
+    files: dict[str, str]
+
+
+@dataclass
+class BatchJob:
+    name: str
+    upload_rules: dict[str, UploadRule]
+    parse: Callable[[dict[str, UploadedFile]], dict]
+
+    @property
+    def single_file_field(self) -> Optional[str]:
+        if len(self.upload_rules) != 1:
+            return None
+        return next(iter(self.upload_rules))
+
+
+def _parse_migration_service(uploads: dict[str, UploadedFile]) -> dict:
+    upload = uploads["personalInfoFile"]
+    result = MigrationService().parse(upload.filename, upload.content)
+
+    return {
+        **result.person.model_dump(mode="json", by_alias=True),
+        "image": base64.b64encode(result.image).decode("utf-8"),
+        "cleanedFile": base64.b64encode(result.cleaned_file).decode("utf-8"),
+    }
+
+
+def _parse_ukrainian_pension_fund(uploads: dict[str, UploadedFile]) -> dict:
+    result = UkrainianPensionFundService().parse(uploads["personalIncomeFile"].content)
+    return result.model_dump(mode="json", by_alias=True)
+
+
+def _parse_main_service_center_mvs_ukraine(uploads: dict[str, UploadedFile]) -> dict:
+    if not uploads:
+        raise NoFilePresentedException()
+
+    result = MainServiceCenterMVSUkraine().parse(
+        uploads.get("driverLicenseFile"), uploads.get("carInfoFile")
+    )
+    return result.model_dump(mode="json", by_alias=True)
+
+
+JOBS = {
+    job.name: job
+    for job in (
+        BatchJob(
+            name="migration_service",
+            upload_rules=migration_service_upload_rules,
+            parse=_parse_migration_service,
+        ),
+        BatchJob(
+            name="ukrainian_pension_fund",
+            upload_rules=ukrainian_pension_fund_upload_rules,
+            parse=_parse_ukrainian_pension_fund,
+        ),
+        BatchJob(
+            name="main_service_center_mvs_ukraine",
+            upload_rules=main_service_center_mvs_ukraine_upload_rules,
+            parse=_parse_main_service_center_mvs_ukraine,
+        ),
+    )
+}
+
+
+def read_uploads(job: BatchJob, item: BatchItem) -> dict[str, UploadedFile]:
+    uploads = {}
+
+    for field_name, path in item.files.items():
+        filename = os.path.basename(path)
+        rule = job.upload_rules[field_name]
+        validate_file_extension(filename, rule.allowed_extensions)
+
+        with open(path, "rb") as file:
+            content = file.read()
+        validate_file_size(filename, len(content), rule.max_size_mb, rule.min_size_mb)
+        validate_file_signature(filename, content)
+
+        uploads[field_name] = UploadedFile(filename=filename, content=content)
+
+    return uploads
@@ -0,0 +1,421 @@
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from core.exceptions import ApplicationException, ProcessingTimeoutException
+from .jobs import JOBS, BatchItem, BatchJob, read_uploads
+
+logger = logging.getLogger(__name__)
+
+TAIL_SCAN_BLOCK = 64 * 1024
+CRASH_MESSAGE = "Процес обробки завершився аварійно"
+WORKER_START_GRACE = 30.0
+
+
+@dataclass
+class BatchOutcome:
+    id: str
+    ok: bool
+    bytes_read: int
+    line: str
+
+
+@dataclass
+class _Submission:
+    item: BatchItem
+    deadline: Optional[float]
+    isolated: bool = False
+
+
+@dataclass
+class BatchStats:
+    total: int
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def add(self, outcome: BatchOutcome) -> None:
+        if outcome.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.bytes_read += outcome.bytes_read
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(self.processed / elapsed, 2) if elapsed else 0,
+            "megabytes_per_second": (
+                round(self.bytes_read / 1024 / 1024 / elapsed, 2) if elapsed else 0
+            ),
+        }
+
+    def log_progress(self) -> None:
+        summary = self.summary()
+        remaining = self.total - self.skipped - self.processed
+        eta = (
+            f", залишилось ~{remaining / summary['files_per_second']:.0f} с"
+            if summary["files_per_second"]
+            else ""
+        )
+        logger.info(
+            f"Оброблено {self.processed} з {self.total - self.skipped} "
+            f"(помилок: {self.failed}), {summary['files_per_second']} файлів/с, "
+            f"{summary['megabytes_per_second']} МБ/с{eta}"
+        )
+
+
+def collect_directory_items(job: BatchJob, directory: str) -> list[BatchItem]:
+    field_name = job.single_file_field
+    extensions = {
+        extension.lower()
+        for extension in job.upload_rules[field_name].allowed_extensions
+    }
+
+    items = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() not in extensions:
+                continue
+
+            path = os.path.join(root, filename)
+            items.append(
+                BatchItem(id=os.path.relpath(path, directory), files={field_name: path})
+            )
+
+    return sorted(items, key=lambda item: item.id)
+
+
+def read_manifest(job: BatchJob, path: str) -> list[BatchItem]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    items = []
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+            unknown_fields = set(entry) - set(job.upload_rules) - {"id"}
+            if unknown_fields:
+                raise ValueError(
+                    f"Рядок {line_number} маніфесту: невідомі поля "
+                    f"{', '.join(sorted(unknown_fields))}. "
+                    f"Дозволені: id, {', '.join(job.upload_rules)}"
+                )
+
+            files = {
+                field_name: os.path.join(base_dir, entry[field_name])
+                for field_name in job.upload_rules
+                if entry.get(field_name)
+            }
+            items.append(
+                BatchItem(
+                    id=str(entry.get("id") or ",".join(files.values())), files=files
+                )
+            )
+
+    return items
+
+
+def load_processed_ids(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+
+    _truncate_partial_line(path)
+
+    processed_ids = set()
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                processed_ids.add(json.loads(line)["id"])
+    return processed_ids
+
+
+def process_item(
+    job_name: str, item: BatchItem, timeout: Optional[float] = None
+) -> BatchOutcome:
+    job = JOBS[job_name]
+    started_at = time.perf_counter()
+    record = {"id": item.id, "files": item.files}
+    bytes_read = 0
+
+    try:
+        with _time_limit(timeout):
+            uploads = read_uploads(job, item)
+            bytes_read = sum(len(upload.content) for upload in uploads.values())
+            record["result"] = job.parse(uploads)
+    except ApplicationException as e:
+        record["error"] = {
+            "exception": type(e).__name__,
+            "status_code": e.status_code,
+            "message": e.message,
+        }
+    except Exception as e:
+        record["error"] = {
+            "exception": type(e).__name__,
+            "status_code": 500,
+            "message": str(e),
+        }
+
+    record["elapsed_seconds"] = round(time.perf_counter() - started_at, 4)
+    return BatchOutcome(
+        id=item.id,
+        ok="error" not in record,
+        bytes_read=bytes_read,
+        line=json.dumps(record, ensure_ascii=False),
+    )
+
+
+def run_batch(
+    job: BatchJob,
+    items: Iterable[BatchItem],
+    results_path: str,
+    errors_path: str,
+    workers: int,
+    resume: bool = False,
+    max_tasks_per_child: Optional[int] = None,
+    progress_interval: float = 10.0,
+    item_timeout: Optional[float] = None,
+) -> BatchStats:
+    items = list(items)
+    stats = BatchStats(total=len(items))
+
+    processed_ids = set()
+    if resume:
+        processed_ids = load_processed_ids(results_path) | load_processed_ids(
+            errors_path
+        )
+    remaining = [item for item in items if item.id not in processed_ids]
+    stats.skipped = len(items) - len(remaining)
+    pending = iter(remaining)
+    if stats.skipped:
+        logger.info(f"Пропущено вже оброблених файлів: {stats.skipped}")
+
+    mode = "a" if resume else "w"
+    executor = _new_executor(workers, max_tasks_per_child)
+    in_flight: dict[Future, _Submission] = {}
+    requeued: deque[BatchItem] = deque()
+    suspects: deque[BatchItem] = deque()
+
+    def submit(item: BatchItem, isolated: bool = False) -> None:
+        deadline = None
+        if item_timeout:
+            deadline = time.monotonic() + item_timeout + WORKER_START_GRACE
+        future = executor.submit(process_item, job.name, item, item_timeout)
+        in_flight[future] = _Submission(item=item, deadline=deadline, isolated=isolated)
+
+    def fill() -> None:
+        if any(submission.isolated for submission in in_flight.values()):
+            return
+
+        if suspects:
+            if not in_flight:
+                submit(suspects.popleft(), isolated=True)
+            return
+
+        while len(in_flight) < workers:
+            item = requeued.popleft() if requeued else next(pending, None)
+            if item is None:
+                return
+            submit(item)
+
+    try:
+        with open(results_path, mode, encoding="utf-8") as results_file, open(
+            errors_path, mode, encoding="utf-8"
+        ) as errors_file:
+
+            def record(outcome: BatchOutcome) -> None:
+                output = results_file if outcome.ok else errors_file
+                output.write(outcome.line + "\n")
+                output.flush()
+                stats.add(outcome)
+
+            last_report = time.perf_counter()
+            while True:
+                fill()
+                if not in_flight:
+                    break
+
+                finished, _ = wait(
+                    in_flight,
+                    timeout=_wait_timeout(in_flight.values(), progress_interval),
+                    return_when=FIRST_COMPLETED,
+                )
+
+                crashed = []
+                for future in finished:
+                    submission = in_flight.pop(future)
+                    try:
+                        record(future.result())
+                    except BrokenProcessPool:
+                        crashed.append(submission)
+
+                now = time.monotonic()
+                overdue = [
+                    future
+                    for future, submission in in_flight.items()
+                    if submission.deadline is not None and now >= submission.deadline
+                ]
+                for future in overdue:
+                    submission = in_flight.pop(future)
+                    logger.warning(
+                        f"'{submission.item.id}' не оброблено за "
+                        f"{item_timeout + WORKER_START_GRACE:g} с, "
+                        f"процеси обробки буде перезапущено"
+                    )
+                    record(
+                        _error_outcome(
+                            submission.item,
+                            ProcessingTimeoutException(timeout_seconds=item_timeout),
+                        )
+                    )
+
+                if crashed or overdue:
+                    lost = crashed + list(in_flight.values())
+                    in_flight.clear()
+                    _terminate(executor)
+                    executor = _new_executor(workers, max_tasks_per_child)
+
+                    if crashed and len(lost) == 1:
+                        logger.error(f"'{lost[0].item.id}': {CRASH_MESSAGE}")
+                        record(_error_outcome(lost[0].item))
+                    elif crashed:
+                        logger.warning(
+                            f"{CRASH_MESSAGE}, {len(lost)} документів "
+                            f"буде оброблено повторно по одному"
+                        )
+                        suspects.extend(submission.item for submission in lost)
+                    else:
+                        requeued.extend(submission.item for submission in lost)
+
+                if time.perf_counter() - last_report >= progress_interval:
+                    stats.log_progress()
+                    last_report = time.perf_counter()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return stats
+
+
+@contextmanager
+def _time_limit(timeout: Optional[float]) -> Iterator[None]:
+    if not timeout:
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ProcessingTimeoutException(timeout_seconds=timeout)
+
+    previous_handler = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _new_executor(
+    workers: int, max_tasks_per_child: Optional[int]
+) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=max_tasks_per_child,
+    )
+
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in multiprocessing.active_children():
+        process.kill()
+        process.join()
+
+
+def _wait_timeout(
+    submissions: Iterable[_Submission], progress_interval: float
+) -> float:
+    deadlines = [
+        submission.deadline
+        for submission in submissions
+        if submission.deadline is not None
+    ]
+    if not deadlines:
+        return progress_interval
+    return max(0.0, min(progress_interval, min(deadlines) - time.monotonic()))
+
+
+def _error_outcome(
+    item: BatchItem, exception: Optional[ApplicationException] = None
+) -> BatchOutcome:
+    if exception is None:
+        error = {
+            "exception": BrokenProcessPool.__name__,
+            "status_code": 500,
+            "message": CRASH_MESSAGE,
+        }
+    else:
+        error = {
+            "exception": type(exception).__name__,
+            "status_code": exception.status_code,
+            "message": exception.message,
+        }
+
+    return BatchOutcome(
+        id=item.id,
+        ok=False,
+        bytes_read=0,
+        line=json.dumps(
+            {"id": item.id, "files": item.files, "error": error}, ensure_ascii=False
+        ),
+    )
+
+
+def _truncate_partial_line(path: str) -> None:
+    with open(path, "rb+") as file:
+        end = file.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+
+        file.seek(end - 1)
+        if file.read(1) == b"\n":
+            return
+
+        position = end
+        while position > 0:
+            block_start = max(0, position - TAIL_SCAN_BLOCK)
+            file.seek(block_start)
+            newline = file.read(position - block_start).rfind(b"\n")
+            if newline != -1:
+                file.truncate(block_start + newline + 1)
+                break
+            position = block_start
+        else:
+            file.truncate(0)
+
+        logger.warning(f"Видалено незавершений рядок у кінці '{path}'")
@@ -0,0 +1,44 @@
+import argparse
+import json
+import logging
+import sys
+
+from .runner import run_benchmarks
+from .stages import SIZES, build_stages
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Мікробенчмарки етапів парсингу на синтетичних документах",
+    )
+    arg_parser.add_argument("--size", choices=SIZES.keys(), default="small")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument(
+        "--stage",
+        action="append",
+        default=[],
+        help="Запускати лише етапи, назва яких містить цей рядок",
+    )
+    arg_parser.add_argument("--output", help="Файл для JSON-результатів")
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    stages = [
+        stage
+        for stage in build_stages(args.size)
+        if not args.stage or any(name in stage.name for name in args.stage)
+    ]
+    results = run_benchmarks(stages, size=args.size, repeat=args.repeat)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+from io import BytesIO
+from typing import Literal, Optional
+from xml.etree import ElementTree as ET
+
+import fitz
+import xlwt
+
+from libs.pdf_parser import PdfStructure
+
+WATERMARK_TEXT = "Користувач ІВАНЕНКО І.І. 01.02.2024 10:00"
+
+MIGRATION_PDF_STRUCTURE = PdfStructure(
+    producer="DMS Report Server",
+    page_sizes=frozenset({(595, 842)}),
+    fonts=frozenset({"/F1"}),
+    xobjects=frozenset({"/I1", "/I2"}),
+)
+
+PERSON_LINES = [
+    "Державна міграційна служба України",
+    "ІНФОРМАЦІЯ ПРО ОСОБУ",
+    "Запит здійснив",
+    "ПЕТРЕНКО ПЕТРО ПЕТРОВИЧ",
+    "Дата запиту",
+    "01.02.2024",
+    "Підстава запиту",
+    "Звернення громадянина",
+    "Прізвище",
+    "ШЕВЧЕНКО",
+    "Ім`я",
+    "ТАРАС",
+    "По батькові",
+    "ГРИГОРОВИЧ",
+    "Дата народження",
+    "09.03.1990",
+    "Стать",
+    "чоловіча",
+    "УНЗР",
+    "19900309-01234",
+    "РНОКПП",
+    "1234567890",
+    "Телефон",
+    "+380501234567",
+    "Місце народження",
+    "М. КИЇВ",
+    "Місце проживання/",
+    "перебування",
+    "М. КИЇВ, ВУЛ. ХРЕЩАТИК,",
+    "БУД. 1, КВ. 2",
+]
+
+SECTION_TITLES = {
+    "Паспорт громадянина України",
+    "Паспорт(и) громадянина України для виїзду за кордон",
+    "Свідоцтво про народження",
+}
+
+LABELS = {
+    "Запит здійснив",
+    "Дата запиту",
+    "Підстава запиту",
+    "Прізвище",
+    "Ім`я",
+    "По батькові",
+    "Дата народження",
+    "Стать",
+    "УНЗР",
+    "РНОКПП",
+    "Телефон",
+    "Місце народження",
+    "Місце проживання/",
+    "перебування",
+    "Номер",
+    "Дата видачі:",
+    "Дійсний до:",
+    "Стан документа:",
+    "Орган видачі:",
+}
+
+CAR_COLORS = ["СІРИЙ", "ЧОРНИЙ", "БІЛИЙ", "СИНІЙ", "ЧЕРВОНИЙ"]
+
+INSURERS = [
+    ("12345678", 'ТОВАРИСТВО З ОБМЕЖЕНОЮ ВІДПОВІДАЛЬНІСТЮ "РОМАШКА"'),
+    ("23456789", 'ПРИВАТНЕ ПІДПРИЄМСТВО "ВЕКТОР"'),
+    ("1234567890", "ФІЗИЧНА ОСОБА-ПІДПРИЄМЕЦЬ ШЕВЧЕНКО Т.Г."),
+    ("34567890", 'ДЕРЖАВНЕ ПІДПРИЄМСТВО "УКРПОШТА"'),
+]
+
+
+def migration_document_lines(
+    passports: int = 2, foreign_passports: int = 2
+) -> list[str]:
+    lines = list(PERSON_LINES)
+
+    lines.append("Паспорт громадянина України")
+    for idx in range(passports):
+        lines += [
+            "Номер",
+            f"{100000000 + idx}",
+            "Дата видачі:",
+            f"{idx % 28 + 1:02d}.{idx % 12 + 1:02d}.{1995 + idx % 30}",
+            "Дійсний до:",
+            f"{idx % 28 + 1:02d}.{idx % 12 + 1:02d}.{2005 + idx % 30}",
+            "Стан документа:",
+            "Дійсний" if idx == passports - 1 else "Недійсний",
+            "Орган видачі:",
+            f"{8000 + idx % 100}",
+        ]
+
+    lines.append("Паспорт(и) громадянина України для виїзду за кордон")
+    for idx in range(foreign_passports):
+        lines += [
+            "Номер",
+            f"FA{100000 + idx}",
+            "Дата видачі:",
+            f"{idx % 28 + 1:02d}.{idx % 12 + 1:02d}.{2000 + idx % 25}",
+            "Дійсний до:",
+            f"{idx % 28 + 1:02d}.{idx % 12 + 1:02d}.{2010 + idx % 25}",
+            "Стан документа:",
+            "Дійсний" if idx == foreign_passports - 1 else "Недійсний",
+            "Орган видачі:",
+            "ДМС УКРАЇНИ",
+            "У М. КИЄВІ",
+        ]
+
+    lines += ["Свідоцтво про народження", "Номер", "I-АБ 123456"]
+    return lines
+
+
+def migration_pdf(
+    pages: int = 2,
+    passports: int = 2,
+    foreign_passports: int = 2,
+    photo_size: tuple[int, int] = (600, 800),
+    watermarks: bool = True,
+    layout: Literal["stacked", "columns"] = "stacked",
+) -> bytes:
+    lines = migration_document_lines(passports, foreign_passports)
+    if layout == "columns":
+        rows = _column_rows(lines)
+    else:
+        rows = [(line, None) for line in lines]
+    rows_per_page = max(1, -(-len(rows) // pages))
+
+    writer = _PdfWriter()
+    catalog_id = writer.reserve()
+    pages_id = writer.reserve()
+    font_id = writer.add_unicode_font()
+    photo_id = writer.add_image(_noise_jpeg(*photo_size))
+    watermark_id = writer.add_image(_noise_jpeg(200, 200))
+
+    page_ids = []
+    for page_num in range(pages):
+        page_rows = rows[page_num * rows_per_page : (page_num + 1) * rows_per_page]
+
+        operations = ["BT", "/F1 10 Tf", "50 800 Td", "12 TL"]
+        for line, _ in page_rows:
+            if line:
+                operations.append(f"{_utf16_hex(line)} Tj")
+            operations.append("T*")
+        if watermarks:
+            operations.append(f"{_utf16_hex(WATERMARK_TEXT)} Tj")
+        operations.append("ET")
+
+        for row, (_, value) in enumerate(page_rows):
+            if value is not None:
+                operations.append(
+                    f"BT /F1 10 Tf 250 {800 - row * 12} Td {_utf16_hex(value)} Tj ET"
+                )
+
+        xobjects = ""
+        if page_num == 0:
+            operations.append("q 120 0 0 160 420 640 cm /I1 Do Q")
+            xobjects += f" /I1 {photo_id} 0 R"
+        if watermarks:
+            operations.append("q 300 0 0 300 150 250 cm /I2 Do Q")
+            xobjects += f" /I2 {watermark_id} 0 R"
+
+        content_id = writer.add_stream(b"", "\n".join(operations).encode("latin-1"))
+        page_ids.append(
+            writer.add(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 {font_id} 0 R >> /XObject <<{xobjects} >> >> "
+                f"/Contents {content_id} 0 R >>".encode()
+            )
+        )
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    writer.set(catalog_id, f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+    writer.set(
+        pages_id,
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode(),
+    )
+    info_id = writer.add(b"<< /Producer (DMS Report Server) /Creator (DMS) >>")
+
+    return writer.to_bytes(root_id=catalog_id, info_id=info_id)
+
+
+def single_car_xls() -> bytes:
+    values = {
+        0: "РЕЄСТРАЦІЙНА КАРТКА ТЗ",
+        1: "AA1234BB",
+        2: "01.02.2020",
+        5: "VOLKSWAGEN GOLF",
+        8: "2015",
+        9: "СІРИЙ",
+        10: "WVWZZZ1KZ6W000001",
+        21: "310 - ПЕРЕРЕЄСТРАЦІЯ ТЗ НА НОВОГО ВЛАСНИКА (ДОГОВІР)",
+        24: "ШЕВЧЕНКО ТАРАС ГРИГОРОВИЧ",
+        25: "М. КИЇВ, ВУЛ. ХРЕЩАТИК, БУД. 1",
+        26: "09.03.1990",
+    }
+
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    for row in range(27):
+        sheet.write(row, 0, values[0] if row == 0 else f"Поле {row}")
+        sheet.write(row, 1, "")
+        sheet.write(row, 2, values.get(row, ""))
+
+    return _workbook_bytes(workbook)
+
+
+def multi_car_xls(rows: int = 10) -> bytes:
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    sheet.write(0, 0, 'Результати аналітичного пошуку ТЗ по "НАІС ДДАІ" МВС України')
+    for row in range(1, 8):
+        sheet.write(row, 0, f"Параметр пошуку {row}")
+
+    for idx in range(rows):
+        color = CAR_COLORS[idx % len(CAR_COLORS)]
+        sheet.write(8 + idx, 0, f"AA{1000 + idx % 9000}BB\n{idx % 28 + 1:02d}.01.2020")
+        sheet.write(
+            8 + idx,
+            1,
+            f"VOLKSWAGEN GOLF, ({2000 + idx % 25}), {color}, "
+            f"№ куз. WVWZZZ1KZ6W{idx:06d}, "
+            "310 - ПЕРЕРЕЄСТРАЦІЯ ТЗ НА НОВОГО ВЛАСНИКА (ДОГОВІР)",
+        )
+        sheet.write(
+            8 + idx,
+            2,
+            "ШЕВЧЕНКО ТАРАС ГРИГОРОВИЧ, нар. 09.03.1990\n"
+            "М. КИЇВ, ВУЛ. ХРЕЩАТИК, БУД. 1",
+        )
+
+    return _workbook_bytes(workbook)
+
+
+def driver_license_xls() -> bytes:
+    values = {
+        1: "ШЕВЧЕНКО",
+        2: "ТАРАС",
+        3: "ГРИГОРОВИЧ",
+        12: "09.03.1990",
+        14: "ВХК",
+        15: "123456",
+        16: "01.02.2015",
+        17: "01.02.2045",
+        18: "ТСЦ 8041",
+        19: "B",
+        22: "М. КИЇВ, ВУЛ. ХРЕЩАТИК, БУД. 1",
+        24: "ДІЙСНЕ",
+    }
+
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    sheet.write(0, 0, "Результат Пошука ПВ")
+    for col in range(25):
+        sheet.write(3, col, f"Колонка {col}")
+        sheet.write(4, col, values.get(col, ""))
+
+    return _workbook_bytes(workbook)
+
+
+def pension_xml(payments: int = 120) -> bytes:
+    root = ET.Element("PERSON_INFO")
+    ET.SubElement(root, "LAST_NAME").text = "ШЕВЧЕНКО"
+    ET.SubElement(root, "FIRST_NAME").text = "ТАРАС"
+    ET.SubElement(root, "SECOND_NAME").text = "ГРИГОРОВИЧ"
+    ET.SubElement(root, "IPN").text = "1234567890"
+
+    payments_root = ET.SubElement(root, "PAYMENTS")
+    for idx in range(payments):
+        insurer_code, insurer_name = INSURERS[(idx // 18) % len(INSURERS)]
+        month = 2000 * 12 + idx + (idx // 30)
+
+        payment = ET.SubElement(payments_root, "PAYMENT")
+        ET.SubElement(payment, "MONTH").text = f"01{month % 12 + 1:02d}{month // 12}"
+        ET.SubElement(payment, "INSURER_CODE").text = insurer_code
+        ET.SubElement(payment, "INSURER_NAME").text = insurer_name
+
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def _column_rows(lines: list[str]) -> list[tuple[str, Optional[str]]]:
+    rows: list[tuple[str, Optional[str]]] = []
+    label_row = None
+
+    for line in lines:
+        if line in LABELS:
+            label_row = len(rows)
+            rows.append((line, None))
+        elif label_row is None or line in SECTION_TITLES:
+            label_row = None
+            rows.append((line, None))
+        elif rows[label_row][1] is None:
+            rows[label_row] = (rows[label_row][0], line)
+        else:
+            rows.append(("", line))
+
+    return rows
+
+
+def _noise_jpeg(width: int, height: int) -> bytes:
+    samples = bytes(
+        (x * 7 + y * 13 + (x * y) % 31) % 256
+        for y in range(height)
+        for x in range(width)
+    )
+    pixmap = fitz.Pixmap(fitz.csGRAY, width, height, samples, False)
+    return pixmap.tobytes("jpeg", jpg_quality=90)
+
+
+def _utf16_hex(text: str) -> str:
+    return f"<{text.encode('utf-16be').hex().upper()}>"
+
+
+def _workbook_bytes(workbook: xlwt.Workbook) -> bytes:
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class _PdfWriter:
+    def __init__(self):
+        self.objects: list[bytes] = []
+
+    def reserve(self) -> int:
+        return self.add(b"")
+
+    def add(self, obj: bytes) -> int:
+        self.objects.append(obj)
+        return len(self.objects)
+
+    def set(self, obj_id: int, obj: bytes) -> None:
+        self.objects[obj_id - 1] = obj
+
+    def add_stream(self, dictionary: bytes, data: bytes) -> int:
+        return self.add(
+            b"<< "
+            + dictionary
+            + f" /Length {len(data)} >>\nstream\n".encode()
+            + data
+            + b"\nendstream"
+        )
+
+    def add_unicode_font(self) -> int:
+        to_unicode_id = self.add_stream(
+            b"",
+            b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+            b"1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+            b"1 beginbfrange <0000> <FFFF> <0000> endbfrange\n"
+            b"endcmap CMapName currentdict /CMap defineresource pop end end",
+        )
+        descriptor_id = self.add(
+            b"<< /Type /FontDescriptor /FontName /ArialMT /Flags 32 "
+            b"/FontBBox [-665 -325 2000 1006] /ItalicAngle 0 /Ascent 905 "
+            b"/Descent -212 /CapHeight 716 /StemV 80 >>"
+        )
+        descendant_id = self.add(
+            f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /ArialMT "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {descriptor_id} 0 R /CIDToGIDMap /Identity /DW 556 >>".encode()
+        )
+        return self.add(
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /ArialMT /Encoding /Identity-H "
+            f"/DescendantFonts [{descendant_id} 0 R] /ToUnicode {to_unicode_id} 0 R >>".encode()
+        )
+
+    def add_image(self, jpeg: bytes) -> int:
+        pixmap = fitz.Pixmap(jpeg)
+        colorspace = "/DeviceGray" if pixmap.n == 1 else "/DeviceRGB"
+        return self.add_stream(
+            f"/Type /XObject /Subtype /Image /Width {pixmap.width} "
+            f"/Height {pixmap.height} /ColorSpace {colorspace} "
+            "/BitsPerComponent 8 /Filter /DCTDecode".encode(),
+            jpeg,
+        )
+
+    def to_bytes(self, root_id: int, info_id: int) -> bytes:
+        output = BytesIO()
+        output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+        offsets = []
+        for obj_id, obj in enumerate(self.objects, start=1):
+            offsets.append(output.tell())
+            output.write(f"{obj_id} 0 obj\n".encode() + obj + b"\nendobj\n")
+
+        xref_offset = output.tell()
+        output.write(f"xref\n0 {len(self.objects) + 1}\n".encode())
+        output.write(b"0000000000 65535 f \n")
+        for offset in offsets:
+            output.write(f"{offset:010d} 00000 n \n".encode())
+
+        output.write(
+            f"trailer\n<< /Size {len(self.objects) + 1} /Root {root_id} 0 R "
+            f"/Info {info_id} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+        return output.getvalue()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import logging
+import sys
+
+from batch.jobs import JOBS
+from core.config import settings
+
+from ..stages import SIZES
+from .corpus import build_targets
+from .runner import run_load
+from .server import LocalServer
+
+
+def _concurrency_levels(value: str) -> list[int]:
+    levels = sorted({int(level) for level in value.split(",") if level.strip()})
+    if not levels or levels[0] < 1:
+        raise argparse.ArgumentTypeError("Рівні конкурентності мають бути >= 1")
+    return levels
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Навантажувальне тестування локального сервера run_main",
+    )
+    arg_parser.add_argument(
+        "--endpoint",
+        action="append",
+        choices=JOBS.keys(),
+        default=[],
+        help="Ендпоінт для тестування, за замовчуванням усі",
+    )
+    arg_parser.add_argument(
+        "--corpus",
+        help="Каталог з документами: <service>/ з файлами або маніфест "
+        "<service>.jsonl як у run_batch.py; без нього — синтетичні документи",
+    )
+    arg_parser.add_argument("--size", choices=SIZES.keys(), default="small")
+    arg_parser.add_argument("--workers", type=int, default=settings.run.workers)
+    arg_parser.add_argument("--port", type=int, default=settings.run.port + 1)
+    arg_parser.add_argument(
+        "--concurrency", type=_concurrency_levels, default=[1, 2, 4, 8, 16]
+    )
+    arg_parser.add_argument("--duration", type=float, default=20.0)
+    arg_parser.add_argument("--warmup", type=float, default=3.0)
+    arg_parser.add_argument("--request-timeout", type=float, default=120.0)
+    arg_parser.add_argument("--rss-interval", type=float, default=0.5)
+    arg_parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.5,
+        help="Пропустити вищі рівні конкурентності, якщо частка помилок більша",
+    )
+    arg_parser.add_argument(
+        "--single-flight",
+        action="store_true",
+        help="Не вимикати об'єднання однакових запитів на сервері",
+    )
+    arg_parser.add_argument("--server-log", help="Файл для логів сервера")
+    arg_parser.add_argument("--output", help="Файл для JSON-результатів")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(format=settings.logging.log_format, level=logging.INFO)
+
+    endpoints = args.endpoint or list(JOBS)
+    try:
+        targets = build_targets(endpoints, args.corpus, args.size)
+    except (OSError, ValueError) as e:
+        arg_parser.error(str(e))
+
+    server = LocalServer(
+        workers=args.workers,
+        port=args.port,
+        env={
+            "APP_CONFIG__SINGLE_FLIGHT__ENABLED": str(args.single_flight).lower(),
+            "APP_CONFIG__LOGGING__LOG_LEVEL": "warning",
+        },
+        log_path=args.server_log,
+    )
+    server.start(timeout=120)
+    try:
+        results = run_load(
+            server,
+            targets,
+            concurrency_levels=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+            request_timeout=args.request_timeout,
+            rss_interval=args.rss_interval,
+            max_error_rate=args.max_error_rate,
+            meta={
+                "workers": args.workers,
+                "pool_size": settings.processing.pool_size,
+                "single_flight": args.single_flight,
+                "corpus": args.corpus or f"synthetic:{args.size}",
+                "requests_per_endpoint": {
+                    target.name: len(target.requests) for target in targets
+                },
+                "duration": args.duration,
+                "warmup": args.warmup,
+            },
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        server.stop()
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from batch.jobs import JOBS, BatchJob
+from batch.runner import collect_directory_items, read_manifest
+from core.config import settings
+
+from .. import generators
+from ..stages import SIZES
+
+
+@dataclass
+class LoadRequest:
+    id: str
+    body: bytes
+    content_type: str
+
+
+@dataclass
+class Target:
+    name: str
+    path: str
+    requests: list[LoadRequest]
+
+
+def endpoint_path(name: str) -> str:
+    return f"{settings.api.prefix}{settings.api.v1.prefix}{getattr(settings.api.v1, name)}/"
+
+
+def encode_multipart(id: str, files: dict[str, tuple[str, bytes]]) -> LoadRequest:
+    boundary = os.urandom(16).hex()
+
+    parts = []
+    for field_name, (filename, content) in files.items():
+        parts += [
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode(),
+            content,
+            b"\r\n",
+        ]
+    parts.append(f"--{boundary}--\r\n".encode())
+
+    return LoadRequest(
+        id=id,
+        body=b"".join(parts),
+        content_type=f"multipart/form-data; boundary={boundary}",
+    )
+
+
+def corpus_target(job: BatchJob, directory: str) -> Target:
+    manifest = os.path.join(directory, f"{job.name}.jsonl")
+    if os.path.exists(manifest):
+        items = read_manifest(job, manifest)
+    else:
+        items = collect_directory_items(job, os.path.join(directory, job.name))
+
+    requests = []
+    for item in items:
+        files = {}
+        for field_name, path in item.files.items():
+            with open(path, "rb") as file:
+                files[field_name] = (os.path.basename(path), file.read())
+        requests.append(encode_multipart(item.id, files))
+
+    if not requests:
+        raise ValueError(
+            f"Немає документів для {job.name}: очікується {manifest} "
+            f"або каталог {os.path.join(directory, job.name)}"
+        )
+    return Target(name=job.name, path=endpoint_path(job.name), requests=requests)
+
+
+def synthetic_target(name: str, size: str) -> Target:
+    params = SIZES[size]
+
+    if name == "migration_service":
+        files = {
+            "personalInfoFile": (
+                "synthetic.pdf",
+                generators.migration_pdf(
+                    pages=params["pages"],
+                    passports=params["passports"],
+                    foreign_passports=params["passports"],
+                ),
+            )
+        }
+    elif name == "ukrainian_pension_fund":
+        files = {
+            "personalIncomeFile": (
+                "synthetic.xml",
+                generators.pension_xml(payments=params["payments"]),
+            )
+        }
+    else:
+        files = {
+            "driverLicenseFile": (
+                "driver_license.xls",
+                generators.driver_license_xls(),
+            ),
+            "carInfoFile": (
+                "car_info.xls",
+                generators.multi_car_xls(rows=params["rows"]),
+            ),
+        }
+
+    return Target(
+        name=name,
+        path=endpoint_path(name),
+        requests=[encode_multipart(f"synthetic-{size}", files)],
+    )
+
+
+def build_targets(names: list[str], corpus: Optional[str], size: str) -> list[Target]:
+    if corpus is None:
+        return [synthetic_target(name, size) for name in names]
+    return [corpus_target(JOBS[name], corpus) for name in names]
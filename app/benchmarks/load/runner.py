@@ -0,0 +1,192 @@
+import http.client
+import itertools
+import logging
+import platform
+import statistics
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from .corpus import Target
+from .server import LocalServer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepRecorder:
+    measure_from: float
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, started_at: float, latency: float, status: str) -> None:
+        if started_at < self.measure_from:
+            return
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+
+
+def _client(
+    server: LocalServer,
+    target: Target,
+    requests: itertools.cycle,
+    stop_at: float,
+    request_timeout: float,
+    recorder: StepRecorder,
+) -> None:
+    connection = http.client.HTTPConnection(
+        server.host, server.port, timeout=request_timeout
+    )
+    try:
+        while (started_at := time.perf_counter()) < stop_at:
+            request = next(requests)
+            try:
+                connection.request(
+                    "POST",
+                    target.path,
+                    body=request.body,
+                    headers={"Content-Type": request.content_type},
+                )
+                response = connection.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                status = type(e).__name__
+            recorder.add(started_at, time.perf_counter() - started_at, status)
+    finally:
+        connection.close()
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def run_step(
+    server: LocalServer,
+    target: Target,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    request_timeout: float,
+    rss_interval: float,
+) -> dict:
+    started_at = time.perf_counter()
+    recorder = StepRecorder(measure_from=started_at + warmup)
+    stop_at = recorder.measure_from + duration
+    requests = itertools.cycle(target.requests)
+
+    clients = [
+        threading.Thread(
+            target=_client,
+            args=(server, target, requests, stop_at, request_timeout, recorder),
+            name=f"load-client-{idx}",
+            daemon=True,
+        )
+        for idx in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+
+    rss_samples = []
+    while any(client.is_alive() for client in clients):
+        if time.perf_counter() >= recorder.measure_from:
+            rss_samples.append(server.rss())
+        time.sleep(rss_interval)
+    finished_at = time.perf_counter()
+
+    latencies = recorder.latencies
+    requests_count = len(latencies)
+    errors = sum(
+        count for status, count in recorder.statuses.items() if status != "200"
+    )
+    elapsed = finished_at - recorder.measure_from
+
+    return {
+        "endpoint": target.name,
+        "concurrency": concurrency,
+        "requests": requests_count,
+        "errors": errors,
+        "error_rate": round(errors / requests_count, 4) if requests_count else 0,
+        "throughput_rps": round(requests_count / elapsed, 2) if elapsed > 0 else 0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0,
+            "max": round(max(latencies, default=0) * 1000, 2),
+        },
+        "statuses": dict(recorder.statuses),
+        "rss": {
+            key: max((sample[key] for sample in rss_samples), default=0)
+            for key in (
+                "total_bytes",
+                "master_bytes",
+                "worker_max_bytes",
+                "pool_process_max_bytes",
+                "processes",
+            )
+        },
+    }
+
+
+def log_step(step: dict) -> None:
+    latency = step["latency_ms"]
+    logger.info(
+        f"{step['endpoint']} x{step['concurrency']}: "
+        f"{step['throughput_rps']} запитів/с, "
+        f"p50 {latency['p50']} мс, p95 {latency['p95']} мс, p99 {latency['p99']} мс, "
+        f"помилок {step['error_rate'] * 100:.1f}%, "
+        f"RSS {step['rss']['total_bytes'] / 1024 / 1024:.0f} МБ"
+    )
+
+
+def run_load(
+    server: LocalServer,
+    targets: list[Target],
+    concurrency_levels: list[int],
+    duration: float,
+    warmup: float,
+    request_timeout: float,
+    rss_interval: float,
+    max_error_rate: float,
+    meta: dict,
+) -> dict:
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = []
+    for target in targets:
+        for concurrency in concurrency_levels:
+            step = run_step(
+                server,
+                target,
+                concurrency=concurrency,
+                duration=duration,
+                warmup=warmup,
+                request_timeout=request_timeout,
+                rss_interval=rss_interval,
+            )
+            log_step(step)
+            results.append(step)
+
+            if step["error_rate"] > max_error_rate:
+                logger.warning(
+                    f"{target.name}: частка помилок {step['error_rate']} "
+                    f"перевищує {max_error_rate}, вищі рівні пропущено"
+                )
+                break
+
+    return {
+        "meta": {
+            **meta,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": started_at,
+        },
+        "results": results,
+    }
@@ -0,0 +1,106 @@
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from core.config import settings
+from core.gunicorn.watchdog import child_pids, read_rss_bytes
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class LocalServer:
+    def __init__(
+        self,
+        workers: int,
+        port: int,
+        env: dict[str, str],
+        log_path: Optional[str] = None,
+    ):
+        self.workers = workers
+        self.host = "127.0.0.1"
+        self.port = port
+        self.env = env
+        self.log_path = log_path
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float) -> None:
+        env = {
+            **os.environ,
+            **self.env,
+            "APP_CONFIG__RUN__HOST": self.host,
+            "APP_CONFIG__RUN__PORT": str(self.port),
+            "APP_CONFIG__RUN__WORKERS": str(self.workers),
+        }
+        log = open(self.log_path or os.devnull, "ab")
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "run_main.py"],
+                cwd=APP_DIR,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        finally:
+            log.close()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Сервер завершився з кодом {self.process.returncode} під час запуску"
+                )
+            if self._healthy() and len(self.worker_pids()) >= self.workers:
+                return
+            time.sleep(0.5)
+
+        self.stop()
+        raise RuntimeError(f"Сервер не запустився за {timeout} с")
+
+    def stop(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=settings.run.graceful_timeout + 5)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+
+    def worker_pids(self) -> list[int]:
+        return child_pids(self.process.pid)
+
+    def rss(self) -> dict[str, int]:
+        workers_rss = []
+        pool_rss = []
+        for worker_pid in self.worker_pids():
+            workers_rss.append(read_rss_bytes(worker_pid) or 0)
+            pool_rss += [read_rss_bytes(pid) or 0 for pid in child_pids(worker_pid)]
+
+        master_rss = read_rss_bytes(self.process.pid) or 0
+        return {
+            "total_bytes": master_rss + sum(workers_rss) + sum(pool_rss),
+            "master_bytes": master_rss,
+            "worker_max_bytes": max(workers_rss, default=0),
+            "pool_process_max_bytes": max(pool_rss, default=0),
+            "processes": 1 + len(workers_rss) + len(pool_rss),
+        }
+
+    def _healthy(self) -> bool:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=2)
+        try:
+            connection.request(
+                "GET",
+                f"{settings.api.prefix}{settings.api.v1.prefix}"
+                f"{settings.api.v1.healthcheck}/",
+            )
+            return connection.getresponse().status == 200
+        except OSError:
+            return False
+        finally:
+            connection.close()
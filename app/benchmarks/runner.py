@@ -0,0 +1,59 @@
+import gc
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from .stages import Stage
+
+
+def measure_stage(stage: Stage, repeat: int) -> dict:
+    timings = []
+
+    for _ in range(repeat):
+        args = stage.setup()
+        gc.collect()
+
+        start = time.perf_counter()
+        stage.run(*args)
+        timings.append(time.perf_counter() - start)
+
+    args = stage.setup()
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        stage.run(*args)
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "stage": stage.name,
+        "params": stage.params,
+        "timings": {
+            "repeat": repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+        },
+        "memory": {
+            "peak_bytes": peak_bytes,
+            "retained_bytes": current_bytes,
+        },
+    }
+
+
+def run_benchmarks(stages: list[Stage], size: str, repeat: int) -> dict:
+    return {
+        "meta": {
+            "size": size,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": [measure_stage(stage, repeat) for stage in stages],
+    }
@@ -0,0 +1,235 @@
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable
+
+from libs.pdf_parser import PdfParser
+from libs.xls_parser import XlsParser
+from services.main_service_center_mvs_ukraine import MainServiceCenterMVSUkraine
+from services.migration_service import MigrationService
+from services.migration_service.layout import extract_layout_document
+from services.migration_service.templates import (
+    DMS_REPORT_SERVER_LAYOUT,
+    DMS_REPORT_SERVER_PLAN,
+    KNOWN_TEMPLATES,
+)
+from services.migration_service.tokenizer import tokenize_migration_document
+from services.ukrainian_pension_fund import UkrainianPensionFundService
+from utils.text_chain import TextChain
+
+from . import generators
+
+# The synthetic reports stand in for a real DMS template so the template
+# stages exercise the fast path.
+KNOWN_TEMPLATES[generators.MIGRATION_PDF_STRUCTURE] = DMS_REPORT_SERVER_PLAN
+
+SIZES: dict[str, dict[str, int]] = {
+    "small": {"pages": 2, "passports": 2, "rows": 10, "payments": 120},
+    "medium": {"pages": 10, "passports": 20, "rows": 200, "payments": 1200},
+    "large": {"pages": 50, "passports": 100, "rows": 2000, "payments": 12000},
+}
+
+
+@dataclass
+class Stage:
+    name: str
+    setup: Callable[[], tuple]
+    run: Callable[..., Any]
+    params: dict[str, int] = field(default_factory=dict)
+
+
+@lru_cache
+def _migration_pdf(pages: int, passports: int) -> bytes:
+    return generators.migration_pdf(
+        pages=pages, passports=passports, foreign_passports=passports
+    )
+
+
+@lru_cache
+def _foreign_passports_block(passports: int) -> str:
+    lines = generators.migration_document_lines(
+        passports=passports, foreign_passports=passports
+    )
+    return tokenize_migration_document(lines).foreign_passports.text
+
+
+@lru_cache
+def _multi_car_xls(rows: int) -> bytes:
+    return generators.multi_car_xls(rows=rows)
+
+
+@lru_cache
+def _single_car_xls() -> bytes:
+    return generators.single_car_xls()
+
+
+@lru_cache
+def _pension_xml(payments: int) -> bytes:
+    return generators.pension_xml(payments=payments)
+
+
+def _cleaned_parser(pages: int, passports: int) -> PdfParser:
+    parser = PdfParser("benchmark.pdf", _migration_pdf(pages, passports))
+    parser.remove_text(["Користувач "])
+    parser.remove_by_operands(["/I2"])
+    return parser
+
+
+@lru_cache
+def _cleaned_document(pages: int, passports: int) -> tuple[bytes, str]:
+    parser = _cleaned_parser(pages, passports)
+    return parser.save_to_bytes(), parser.text()
+
+
+def build_stages(size: str) -> list[Stage]:
+    params = SIZES[size]
+    pages, passports = params["pages"], params["passports"]
+    rows, payments = params["rows"], params["payments"]
+
+    pdf_params = {"pages": pages, "passports": passports}
+    migration_service = MigrationService()
+    pension_service = UkrainianPensionFundService()
+
+    def new_parser() -> tuple:
+        return (PdfParser("benchmark.pdf", _migration_pdf(pages, passports)),)
+
+    def pension_payments() -> tuple:
+        root = ET.fromstring(_pension_xml(payments))
+        return (pension_service._parse_payments(root),)
+
+    addresses = [
+        f"  М. КИЇВ,   ВУЛ. ХРЕЩАТИК, БУД. {idx}, КВ. 2 " for idx in range(rows)
+    ]
+    organizations = [
+        generators.INSURERS[idx % len(generators.INSURERS)][1] for idx in range(rows)
+    ]
+    document_numbers = [f"FA{100000 + idx}" for idx in range(rows)]
+
+    return [
+        Stage(
+            name="pdf_parser.text",
+            setup=new_parser,
+            run=lambda parser: parser.text(),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.remove_text",
+            setup=new_parser,
+            run=lambda parser: parser.remove_text(["Користувач "]),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.remove_by_operands",
+            setup=new_parser,
+            run=lambda parser: parser.remove_by_operands(["/I2"]),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.clean",
+            setup=new_parser,
+            run=lambda parser: parser.clean(["Користувач "], ["/I2"]),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.save_to_bytes",
+            setup=lambda: (_cleaned_parser(pages, passports),),
+            run=lambda parser: parser.save_to_bytes(),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.save_to_bytes[compact]",
+            setup=lambda: (_cleaned_parser(pages, passports),),
+            run=lambda parser: parser.save_to_bytes(compact=True),
+            params=pdf_params,
+        ),
+        Stage(
+            name="pdf_parser.get_image_by_index",
+            setup=new_parser,
+            run=lambda parser: parser.get_image_by_index(0),
+            params=pdf_params,
+        ),
+        Stage(
+            name="migration_service._clean",
+            setup=lambda: ("benchmark.pdf", _migration_pdf(pages, passports)),
+            run=migration_service._clean,
+            params=pdf_params,
+        ),
+        Stage(
+            name="migration_service._parse_text",
+            setup=lambda: (_cleaned_document(pages, passports)[1],),
+            run=migration_service._parse_text,
+            params=pdf_params,
+        ),
+        Stage(
+            name="migration_service.layout_extraction",
+            setup=lambda: (
+                _cleaned_document(pages, passports)[0],
+                DMS_REPORT_SERVER_LAYOUT,
+            ),
+            run=extract_layout_document,
+            params=pdf_params,
+        ),
+        Stage(
+            name="migration_service._parse_document_block",
+            setup=lambda: (_foreign_passports_block(passports),),
+            run=migration_service._parse_document_block,
+            params={"passports": passports},
+        ),
+        Stage(
+            name="xls_parser.load",
+            setup=lambda: (_multi_car_xls(rows),),
+            run=XlsParser,
+            params={"rows": rows},
+        ),
+        Stage(
+            name="main_service_center_mvs_ukraine._parse_multi_car_info",
+            setup=lambda: (XlsParser(_multi_car_xls(rows)),),
+            run=MainServiceCenterMVSUkraine._parse_multi_car_info,
+            params={"rows": rows},
+        ),
+        Stage(
+            name="main_service_center_mvs_ukraine._parse_single_car_info",
+            setup=lambda: (XlsParser(_single_car_xls()),),
+            run=MainServiceCenterMVSUkraine._parse_single_car_info,
+        ),
+        Stage(
+            name="ukrainian_pension_fund._process_range_payments",
+            setup=pension_payments,
+            run=pension_service._process_range_payments,
+            params={"payments": payments},
+        ),
+        Stage(
+            name="text_chain.normalize_address",
+            setup=lambda: (addresses,),
+            run=lambda values: [
+                TextChain(value)
+                .clean_whitespace()
+                .capitalize_each_word()
+                .normalize_address()
+                .get()
+                for value in values
+            ],
+            params={"values": rows},
+        ),
+        Stage(
+            name="text_chain.shorten_organization_name",
+            setup=lambda: (organizations,),
+            run=lambda values: [
+                TextChain(value)
+                .normalize_ukrainian_chars()
+                .shorten_organization_name()
+                .normalize_quotes()
+                .get()
+                for value in values
+            ],
+            params={"values": rows},
+        ),
+        Stage(
+            name="text_chain.normalize_document_number",
+            setup=lambda: (document_numbers,),
+            run=lambda values: [
+                TextChain(value).normalize_document_number().get() for value in values
+            ],
+            params={"values": rows},
+        ),
+    ]
@@ -13,6 +13,11 @@ class RunConfig(BaseModel):
     port: int = 9889
     workers: int = 4
     timeout: int = 3600
+    graceful_timeout: int = 30
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    max_worker_rss_mb: int = 0
+    rss_check_interval: float = 10.0
 
 
 class ApiV1Prefix(BaseModel):
@@ -21,6 +26,8 @@ class ApiV1Prefix(BaseModel):
     ukrainian_pension_fund: str = "/ukrainian_pension_fund"
     main_service_center_mvs_ukraine: str = "/main_service_center_mvs_ukraine"
     healthcheck: str = "/healthcheck"
+    metrics: str = "/metrics"
+    debug: str = "/debug"
 
 
 class ApiPrefix(BaseModel):
@@ -39,6 +46,69 @@ class LoggingConfig(BaseModel):
     log_format: str = LOG_DEFAULT_FORMAT
 
 
+class MigrationServiceImageConfig(BaseModel):
+    max_width: int = 300
+    max_height: int = 400
+    format: Literal["jpeg", "webp"] = "jpeg"
+    quality: int = 80
+
+
+class MigrationServiceConfig(BaseModel):
+    image: MigrationServiceImageConfig = MigrationServiceImageConfig()
+    compact_cleaned_file: bool = True
+    layout_extraction: bool = True
+
+
+class ProcessingDeadlinesConfig(BaseModel):
+    migration_service: float = 30.0
+    ukrainian_pension_fund: float = 15.0
+    main_service_center_mvs_ukraine: float = 20.0
+
+
+class ProcessingConfig(BaseModel):
+    pool_size: int = 2
+    deadlines: ProcessingDeadlinesConfig = ProcessingDeadlinesConfig()
+
+
+class SingleFlightConfig(BaseModel):
+    enabled: bool = True
+    directory: Optional[str] = None
+    result_ttl: float = 30.0
+    poll_interval: float = 0.05
+
+
+class TracingConfig(BaseModel):
+    server_timing: bool = False
+    sample_rate: float = 0.0
+    honor_remote_sampling: bool = False
+    export_path: str = "traces.jsonl"
+    export_max_bytes: int = 50 * 1024 * 1024
+    service_name: str = "a_parser_app"
+
+
+class MetricsConfig(BaseModel):
+    multiprocess_dir: str = "/tmp/a_parser_metrics"
+
+
+class MemoryProfilingConfig(BaseModel):
+    sample_rate: float = 0.0
+    top_sites: int = 10
+    traceback_frames: int = 1
+    export_path: str = "memory_profiles.jsonl"
+
+
+class ProfilingConfig(BaseModel):
+    enabled: bool = False
+    interval_ms: float = 5.0
+    storage_dir: str = "profiles"
+    max_profiles: int = 50
+
+
+class DebugConfig(BaseModel):
+    enabled: bool = False
+    token: Optional[str] = None
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=(".env.template", ".env"),
@@ -49,6 +119,14 @@ class Settings(BaseSettings):
     run: RunConfig = RunConfig()
     api: ApiPrefix = ApiPrefix()
     logging: LoggingConfig = LoggingConfig()
+    migration_service: MigrationServiceConfig = MigrationServiceConfig()
+    processing: ProcessingConfig = ProcessingConfig()
+    single_flight: SingleFlightConfig = SingleFlightConfig()
+    tracing: TracingConfig = TracingConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    memory_profiling: MemoryProfilingConfig = MemoryProfilingConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    debug: DebugConfig = DebugConfig()
 
 
 settings = Settings()
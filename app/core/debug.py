@@ -0,0 +1,13 @@
+import hmac
+from typing import Optional
+
+from core.config import settings
+
+DEBUG_TOKEN_HEADER = "x-debug-token"
+
+
+def has_debug_access(token: Optional[str]) -> bool:
+    if not settings.debug.enabled or settings.debug.token is None:
+        return False
+
+    return token is not None and hmac.compare_digest(token, settings.debug.token)
@@ -3,8 +3,23 @@ __all__ = (
     "FileValidationException",
     "ValidationException",
     "NoFilePresentedException",
+    "RequestTooLargeException",
+    "DebugAccessDeniedException",
+    "ProfileNotFoundException",
+    "MemoryProfilerBusyException",
+    "ProcessingTimeoutException",
 )
 
 from .base import ApplicationException
-from .file import FileValidationException, NoFilePresentedException
+from .file import (
+    FileValidationException,
+    NoFilePresentedException,
+    RequestTooLargeException,
+)
 from .validation import ValidationException
+from .debug import (
+    DebugAccessDeniedException,
+    MemoryProfilerBusyException,
+    ProfileNotFoundException,
+)
+from .processing import ProcessingTimeoutException
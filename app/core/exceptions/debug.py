@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+
+from core.exceptions import ApplicationException
+
+
+@dataclass
+class DebugAccessDeniedException(ApplicationException):
+    status_code: int = field(default=403)
+
+    @property
+    def message(self):
+        return "Доступ до налагоджувальних даних заборонено"
+
+
+@dataclass
+class ProfileNotFoundException(ApplicationException):
+    profile_id: str = field(default=None)
+    status_code: int = field(default=404)
+
+    @property
+    def message(self):
+        return f"Профіль '{self.profile_id}' не знайдено"
+
+
+@dataclass
+class MemoryProfilerBusyException(ApplicationException):
+    status_code: int = field(default=409)
+
+    @property
+    def message(self):
+        return "Профілювання пам'яті вже виконується в цьому процесі"
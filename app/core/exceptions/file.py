@@ -21,3 +21,13 @@ class NoFilePresentedException(ApplicationException):
     @property
     def message(self):
         return f"Відстуні необхідні файли"
+
+
+@dataclass
+class RequestTooLargeException(ApplicationException):
+    max_size_mb: float = field(default=None)
+    status_code: int = field(default=413)
+
+    @property
+    def message(self):
+        return f"Запит занадто великий. Максимальний розмір: {self.max_size_mb:.2f} МБ"
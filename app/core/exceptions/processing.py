@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+
+from core.exceptions import ApplicationException
+
+
+@dataclass
+class ProcessingTimeoutException(ApplicationException):
+    timeout_seconds: float = field(default=None)
+    status_code: int = field(default=504)
+
+    @property
+    def message(self):
+        return f"Перевищено час обробки запиту ({self.timeout_seconds:g} с)"
@@ -1,3 +1,4 @@
+from .hooks import child_exit, on_starting, when_ready, worker_exit
 from .logger import GunicornLogger
 
 
@@ -5,6 +6,9 @@ def get_app_options(
     host: str,
     port: int,
     timeout: int,
+    graceful_timeout: int,
+    max_requests: int,
+    max_requests_jitter: int,
     workers: int,
     log_level: str,
 ) -> dict:
@@ -13,8 +17,15 @@ def get_app_options(
         "errorlog": "-",
         "bind": f"{host}:{port}",
         "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
         "workers": workers,
-        "worker_class": "uvicorn.workers.UvicornWorker",
+        "worker_class": "core.gunicorn.worker.RecyclingUvicornWorker",
         "loglevel": log_level,
         "logger_class": GunicornLogger,
+        "on_starting": on_starting,
+        "when_ready": when_ready,
+        "child_exit": child_exit,
+        "worker_exit": worker_exit,
     }
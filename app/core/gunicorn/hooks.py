@@ -0,0 +1,42 @@
+from typing import Optional
+
+from core.config import settings
+from core.metrics import WORKER_RECYCLES, mark_process_dead, reset_multiprocess_dir
+from .watchdog import RssWatchdog
+
+_watchdog: Optional[RssWatchdog] = None
+
+
+def on_starting(server) -> None:
+    reset_multiprocess_dir()
+
+
+def when_ready(server) -> None:
+    global _watchdog
+
+    if settings.run.max_worker_rss_mb <= 0:
+        return
+
+    _watchdog = RssWatchdog(
+        server,
+        max_rss_mb=settings.run.max_worker_rss_mb,
+        interval=settings.run.rss_check_interval,
+        graceful_timeout=settings.run.graceful_timeout,
+    )
+    _watchdog.start()
+
+
+def child_exit(server, worker) -> None:
+    mark_process_dead(worker.pid)
+
+    if _watchdog is not None:
+        _watchdog.worker_exited(worker.pid)
+
+
+def worker_exit(server, worker) -> None:
+    if getattr(worker, "reached_max_requests", False):
+        server.log.info(
+            f"Воркер (pid: {worker.pid}) перезапускається після "
+            f"{worker.served_requests} запитів (max_requests)"
+        )
+        WORKER_RECYCLES.labels(reason="max_requests").inc()
@@ -0,0 +1,136 @@
+import os
+import signal
+import threading
+import time
+from typing import Optional
+
+from core.metrics import WORKER_RECYCLES
+
+
+class RssWatchdog:
+    def __init__(
+        self,
+        server,
+        max_rss_mb: int,
+        interval: float,
+        graceful_timeout: float,
+    ):
+        self.server = server
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.interval = interval
+        self.graceful_timeout = graceful_timeout
+        self.draining: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="rss-watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        self.server.log.info(
+            f"RSS watchdog запущено: ліміт {self.max_rss_bytes // 1024 // 1024} МБ, "
+            f"інтервал {self.interval} с"
+        )
+        self._thread.start()
+
+    def worker_exited(self, pid: int) -> None:
+        with self._lock:
+            drain_started_at = self.draining.pop(pid, None)
+
+        if drain_started_at is not None:
+            self.server.log.info(
+                f"Воркер (pid: {pid}) перезапущено через RSS, "
+                f"дренування тривало {time.monotonic() - drain_started_at:.1f} с"
+            )
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self._check_workers()
+            except Exception as e:
+                self.server.log.error(f"Помилка RSS watchdog: {e}")
+
+    def _check_workers(self) -> None:
+        self._kill_stuck_workers()
+
+        with self._lock:
+            if self.draining:
+                return
+
+        workers_rss = {
+            pid: rss
+            for pid in list(self.server.WORKERS)
+            if (rss := read_tree_rss_bytes(pid)) is not None
+        }
+        if not workers_rss:
+            return
+
+        pid, rss = max(workers_rss.items(), key=lambda item: item[1])
+        if rss <= self.max_rss_bytes:
+            return
+
+        self.server.log.warning(
+            f"Воркер (pid: {pid}) разом з процесами пулу використовує "
+            f"{rss // 1024 // 1024} МБ RSS "
+            f"(ліміт {self.max_rss_bytes // 1024 // 1024} МБ), "
+            f"плавний перезапуск"
+        )
+        with self._lock:
+            self.draining[pid] = time.monotonic()
+        WORKER_RECYCLES.labels(reason="rss").inc()
+        self._signal(pid, signal.SIGTERM)
+
+    def _kill_stuck_workers(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stuck = [
+                pid
+                for pid, drain_started_at in self.draining.items()
+                if now - drain_started_at > self.graceful_timeout
+            ]
+
+        for pid in stuck:
+            self.server.log.warning(
+                f"Воркер (pid: {pid}) не завершився за {self.graceful_timeout} с, "
+                f"примусове завершення"
+            )
+            self._signal(pid, signal.SIGKILL)
+            with self._lock:
+                self.draining.pop(pid, None)
+
+    def _signal(self, pid: int, sig: signal.Signals) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            with self._lock:
+                self.draining.pop(pid, None)
+
+
+def read_rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def read_tree_rss_bytes(pid: int) -> Optional[int]:
+    rss = read_rss_bytes(pid)
+    if rss is None:
+        return None
+    return rss + sum(read_rss_bytes(child) or 0 for child in child_pids(pid))
+
+
+def child_pids(pid: int) -> list[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                stat = file.read()
+        except OSError:
+            continue
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            pids.append(int(entry))
+    return pids
@@ -0,0 +1,30 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from uvicorn.workers import UvicornWorker
+
+
+class _RequestCounter:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.requests = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            self.requests += 1
+        await self.app(scope, receive, send)
+
+
+class RecyclingUvicornWorker(UvicornWorker):
+    def load_wsgi(self) -> None:
+        super().load_wsgi()
+        self.wsgi = _RequestCounter(self.wsgi)
+
+    @property
+    def served_requests(self) -> int:
+        counter = getattr(self, "wsgi", None)
+        if not isinstance(counter, _RequestCounter):
+            return 0
+        return counter.requests
+
+    @property
+    def reached_max_requests(self) -> bool:
+        return self.cfg.max_requests > 0 and self.served_requests >= self.max_requests
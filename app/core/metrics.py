@@ -0,0 +1,113 @@
+import os
+import shutil
+
+from core.config import settings
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.metrics.multiprocess_dir)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Тривалість обробки HTTP-запиту",
+    ["method", "endpoint", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+UPLOAD_SIZE = Histogram(
+    "upload_size_bytes",
+    "Розмір завантаженого файлу",
+    ["document"],
+    buckets=(
+        16 * 1024,
+        64 * 1024,
+        256 * 1024,
+        512 * 1024,
+        1024 * 1024,
+        2 * 1024 * 1024,
+        5 * 1024 * 1024,
+        10 * 1024 * 1024,
+    ),
+)
+
+PDF_PAGES = Histogram(
+    "pdf_pages",
+    "Кількість сторінок у PDF-документі",
+    ["document"],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+XLS_ROWS = Histogram(
+    "xls_rows",
+    "Кількість рядків у XLS-документі",
+    ["document"],
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+
+PAYMENTS = Histogram(
+    "pension_payments",
+    "Кількість виплат у довідці ПФУ",
+    ["kind"],
+    buckets=(0, 10, 50, 100, 250, 500, 1000, 5000),
+)
+
+ERRORS = Counter(
+    "application_errors_total",
+    "Кількість помилок обробки за типом винятку",
+    ["endpoint", "exception"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Звернення до кешів",
+    ["cache", "result"],
+)
+
+POOL_TASKS = Counter(
+    "pool_tasks_total",
+    "Завдання пулу процесів",
+    ["pool", "outcome"],
+)
+
+POOL_BUSY_WORKERS = Gauge(
+    "pool_busy_workers",
+    "Кількість зайнятих процесів пулу",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+WORKER_RECYCLES = Counter(
+    "worker_recycles_total",
+    "Кількість перезапусків воркерів",
+    ["reason"],
+)
+
+
+def record_error(endpoint: str, exception: Exception) -> None:
+    ERRORS.labels(endpoint=endpoint, exception=type(exception).__name__).inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def reset_multiprocess_dir() -> None:
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    multiprocess.mark_process_dead(pid)
@@ -0,0 +1,13 @@
+__all__ = (
+    "MemoryProfilingMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "TracingMiddleware",
+    "UploadValidationMiddleware",
+)
+
+from .memory_profiling import MemoryProfilingMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .tracing import TracingMiddleware
+from .upload_validation import UploadValidationMiddleware
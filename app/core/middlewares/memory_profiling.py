@@ -0,0 +1,99 @@
+import random
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import MemoryProfilingConfig
+from core.debug import DEBUG_TOKEN_HEADER, has_debug_access
+from core.exceptions import MemoryProfilerBusyException
+from utils.memory_profiler import (
+    MemoryProfiler,
+    export_memory_profile,
+    log_memory_profile,
+)
+from utils.tracing import Trace
+
+MEMORY_PROFILE_HEADER = "x-memory-profile"
+
+
+class MemoryProfilingMiddleware:
+    def __init__(self, app: ASGIApp, config: MemoryProfilingConfig):
+        self.app = app
+        self.config = config
+        self._in_flight = 0
+        self._concurrent_requests: Optional[int] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._in_flight += 1
+        if self._concurrent_requests is not None:
+            self._concurrent_requests += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        requested = self._is_requested(scope)
+        sampled = (
+            not requested
+            and self._in_flight == 1
+            and self.config.sample_rate > 0
+            and random.random() < self.config.sample_rate
+        )
+        if not requested and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = MemoryProfiler.acquire(
+            request=f"{scope['method']} {scope['path']}",
+            top_sites=self.config.top_sites,
+            traceback_frames=self.config.traceback_frames,
+        )
+        if profiler is None:
+            if requested:
+                await MemoryProfilerBusyException().to_json_response()(
+                    scope, receive, send
+                )
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        trace = Trace.current()
+        token = None
+        if trace is None:
+            trace = Trace.start(sample_rate=0)
+            token = trace.activate()
+
+        self._concurrent_requests = self._in_flight - 1
+        profiler.start()
+        trace.observers.append(profiler)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            trace.observers.remove(profiler)
+            profile = profiler.stop()
+            profile["trace_id"] = trace.trace_id
+            profile["process_wide"] = True
+            profile["concurrent_requests"] = self._concurrent_requests
+            self._concurrent_requests = None
+
+            if token is not None:
+                trace.deactivate(token)
+
+            log_memory_profile(profile)
+            await run_in_threadpool(
+                export_memory_profile, self.config.export_path, profile
+            )
+
+    def _is_requested(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get(MEMORY_PROFILE_HEADER) not in ("1", "true"):
+            return False
+
+        return has_debug_access(headers.get(DEBUG_TOKEN_HEADER))
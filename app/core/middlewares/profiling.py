@@ -0,0 +1,45 @@
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import ProfilingConfig
+from core.debug import DEBUG_TOKEN_HEADER, has_debug_access
+from core.profiling import release_profile_request, request_profile
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, config: ProfilingConfig):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def profile_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        token = request_profile(profile_id)
+        try:
+            await self.app(scope, receive, profile_send)
+        finally:
+            release_profile_request(token)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if not self.config.enabled:
+            return False
+
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) not in ("1", "true"):
+            return False
+
+        return has_debug_access(headers.get(DEBUG_TOKEN_HEADER))
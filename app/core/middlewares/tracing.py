@@ -0,0 +1,64 @@
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import TracingConfig
+from core.debug import DEBUG_TOKEN_HEADER, has_debug_access
+from utils.tracing import Trace
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, config: TracingConfig):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        trace = Trace.start(
+            sample_rate=self.config.sample_rate,
+            traceparent=headers.get("traceparent"),
+            honor_remote_sampling=self.config.honor_remote_sampling,
+        )
+        server_timing_enabled = self.config.server_timing or has_debug_access(
+            headers.get(DEBUG_TOKEN_HEADER)
+        )
+        if not trace.sampled and not server_timing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        root_span = trace.root_span(
+            f"{scope['method']} {scope['path']}",
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+
+        async def timing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root_span.set_attribute("http.status_code", message["status"])
+                if server_timing_enabled:
+                    total_ms = (time.time_ns() - root_span.start_ns) / 1_000_000
+                    server_timing = ", ".join(
+                        filter(
+                            None, [trace.server_timing(), f"total;dur={total_ms:.2f}"]
+                        )
+                    )
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing)
+            await send(message)
+
+        token = trace.activate()
+        try:
+            with root_span:
+                await self.app(scope, receive, timing_send)
+        finally:
+            trace.deactivate(token)
+
+            if trace.sampled:
+                trace.export(
+                    self.config.export_path,
+                    self.config.service_name,
+                    self.config.export_max_bytes,
+                )
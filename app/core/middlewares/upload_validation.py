@@ -0,0 +1,94 @@
+import logging
+from typing import Optional
+
+from python_multipart.multipart import parse_options_header
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.exceptions import ApplicationException, RequestTooLargeException
+from core.metrics import record_error
+from utils.validate_file import UploadRule, UploadStreamValidator
+
+logger = logging.getLogger(__name__)
+
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadValidationMiddleware:
+    def __init__(self, app: ASGIApp, rules: dict[str, dict[str, UploadRule]]):
+        self.app = app
+        self.rules = {path.rstrip("/"): rule for path, rule in rules.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rules = self._get_rules(scope)
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_type, options = parse_options_header(headers.get("content-type"))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = (
+            sum(rule.max_size_bytes for rule in rules.values()) + FORM_OVERHEAD_BYTES
+        )
+        max_body_size_mb = max_body_size / 1024 / 1024
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > max_body_size:
+                exception = RequestTooLargeException(max_size_mb=max_body_size_mb)
+                record_error("upload_validation", exception)
+                await exception.to_json_response()(scope, receive, send)
+                return
+
+        validator: Optional[UploadStreamValidator] = UploadStreamValidator(
+            options[b"boundary"], rules
+        )
+        error: Optional[ApplicationException] = None
+        received_size = 0
+
+        async def validating_receive() -> Message:
+            nonlocal validator, error, received_size
+
+            message = await receive()
+            if message["type"] != "http.request" or validator is None:
+                return message
+
+            body = message.get("body", b"")
+            received_size += len(body)
+
+            try:
+                if received_size > max_body_size:
+                    raise RequestTooLargeException(max_size_mb=max_body_size_mb)
+                validator.feed(body)
+            except ApplicationException as e:
+                error = e
+                validator = None
+                raise
+            except Exception as e:
+                logger.warning(f"Не вдалося перевірити потік завантаження: {e}")
+                validator = None
+
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            if error is None:
+                await send(message)
+
+        try:
+            await self.app(scope, validating_receive, guarded_send)
+        except Exception:
+            if error is None:
+                raise
+
+        if error is not None:
+            record_error("upload_validation", error)
+            await error.to_json_response()(scope, receive, send)
+
+    def _get_rules(self, scope: Scope) -> Optional[dict[str, UploadRule]]:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        return self.rules.get(scope["path"].rstrip("/"))
@@ -0,0 +1,353 @@
+import asyncio
+import dataclasses
+import importlib
+import logging
+import multiprocessing
+import pickle
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+from core.config import settings
+from core.exceptions import ApplicationException, ProcessingTimeoutException
+from core.metrics import POOL_BUSY_WORKERS, POOL_TASKS, mark_process_dead
+from core.profiling import current_sampling_profiler
+from utils.memory_profiler import MemoryProfiler
+from utils.sampling_profiler import SamplingProfiler
+from utils.tracing import Trace, current_span_id, span
+
+logger = logging.getLogger(__name__)
+
+POOL_NAME = "processing"
+POOL_START_TIMEOUT = 60
+
+
+@dataclass
+class _TaskContext:
+    trace_id: Optional[str] = None
+    parent_span_id: Optional[str] = None
+    memory_profile: Optional[dict] = None
+    sampling_interval: Optional[float] = None
+
+    @classmethod
+    def capture(cls) -> "_TaskContext":
+        context = cls()
+
+        trace = Trace.current()
+        if trace is not None:
+            context.trace_id = trace.trace_id
+            context.parent_span_id = current_span_id()
+
+            for observer in trace.observers:
+                if isinstance(observer, MemoryProfiler):
+                    context.memory_profile = {
+                        "top_sites": observer.top_sites,
+                        "traceback_frames": observer.traceback_frames,
+                    }
+
+        sampling_profiler = current_sampling_profiler()
+        if sampling_profiler is not None:
+            context.sampling_interval = sampling_profiler.interval
+
+        return context
+
+    def apply(self, outcome: "_TaskOutcome") -> None:
+        trace = Trace.current()
+        if trace is not None:
+            trace.add_spans(outcome.spans)
+
+            if outcome.memory_profile is not None:
+                for observer in trace.observers:
+                    if isinstance(observer, MemoryProfiler):
+                        observer.add_child_profile(outcome.memory_profile)
+
+        sampling_profiler = current_sampling_profiler()
+        if sampling_profiler is not None and outcome.stacks:
+            sampling_profiler.merge(outcome.stacks)
+
+
+@dataclass
+class _TaskOutcome:
+    result: Any = None
+    error: Optional[BaseException] = None
+    error_fields: Optional[dict] = None
+    spans: list[dict] = field(default_factory=list)
+    memory_profile: Optional[dict] = None
+    stacks: Optional[dict[str, int]] = None
+
+    def unwrap(self) -> Any:
+        if self.error is None:
+            return self.result
+
+        if self.error_fields is not None:
+            raise type(self.error)(**self.error_fields)
+        raise self.error
+
+
+class _PoolProcess:
+    def __init__(
+        self, context: multiprocessing.context.SpawnContext, preload: tuple[str, ...]
+    ):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, preload), name="processing-pool"
+        )
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+        if not self.conn.poll(POOL_START_TIMEOUT):
+            self.kill()
+            raise TimeoutError()
+        self.conn.recv()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def execute(self, task: tuple, timeout: float) -> "_TaskOutcome":
+        self.conn.send(task)
+        if not self.conn.poll(max(timeout, 0)):
+            raise TimeoutError()
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+        mark_process_dead(self.pid)
+
+
+class ProcessPool:
+    def __init__(self, size: int, preload: tuple[str, ...] = ()):
+        self.size = size
+        self.preload = preload
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="processing-pool"
+        )
+        self._processes: list[_PoolProcess] = []
+        self._idle: Optional[asyncio.Queue[_PoolProcess]] = None
+        self._replacements: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._idle is not None:
+            return
+
+        self._idle = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        self._processes = await asyncio.gather(
+            *(
+                loop.run_in_executor(None, _PoolProcess, self._context, self.preload)
+                for _ in range(self.size)
+            )
+        )
+        for worker in self._processes:
+            self._idle.put_nowait(worker)
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        timeout: float,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        await self.start()
+
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + timeout
+        idle = self._idle
+
+        try:
+            with span("pool.queue"):
+                worker = await asyncio.wait_for(idle.get(), deadline - loop.time())
+        except asyncio.TimeoutError:
+            POOL_TASKS.labels(pool=POOL_NAME, outcome="timeout").inc()
+            raise ProcessingTimeoutException(timeout_seconds=timeout)
+
+        POOL_BUSY_WORKERS.labels(pool=POOL_NAME).inc()
+        try:
+            with span("pool.task", function=func.__qualname__):
+                context = _TaskContext.capture()
+                outcome = await loop.run_in_executor(
+                    self._executor,
+                    worker.execute,
+                    (func, args, context),
+                    deadline - loop.time(),
+                )
+        except TimeoutError:
+            logger.warning(
+                f"Перевищено час обробки {timeout} с у {func.__qualname__}, "
+                f"процес {worker.pid} буде перезапущено"
+            )
+            POOL_TASKS.labels(pool=POOL_NAME, outcome="timeout").inc()
+            self._replace(worker)
+            raise ProcessingTimeoutException(timeout_seconds=timeout)
+        except (EOFError, OSError) as e:
+            logger.error(f"Процес пулу {worker.pid} завершився аварійно: {e}")
+            POOL_TASKS.labels(pool=POOL_NAME, outcome="crashed").inc()
+            self._replace(worker)
+            raise ApplicationException()
+        except asyncio.CancelledError:
+            POOL_TASKS.labels(pool=POOL_NAME, outcome="cancelled").inc()
+            self._replace(worker)
+            raise
+        except Exception as e:
+            logger.error(
+                f"Не вдалося передати завдання {func.__qualname__} "
+                f"процесу пулу {worker.pid}: {e}"
+            )
+            POOL_TASKS.labels(pool=POOL_NAME, outcome="error").inc()
+            self._replace(worker)
+            raise
+        else:
+            idle.put_nowait(worker)
+        finally:
+            POOL_BUSY_WORKERS.labels(pool=POOL_NAME).dec()
+
+        POOL_TASKS.labels(
+            pool=POOL_NAME, outcome="error" if outcome.error else "ok"
+        ).inc()
+        context.apply(outcome)
+        return outcome.unwrap()
+
+    def shutdown(self) -> None:
+        for task in self._replacements:
+            task.cancel()
+        for worker in self._processes:
+            worker.kill()
+        self._processes.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _replace(self, worker: _PoolProcess) -> None:
+        worker.process.kill()
+
+        task = asyncio.ensure_future(self._respawn(worker))
+        self._replacements.add(task)
+        task.add_done_callback(self._replacements.discard)
+
+    async def _respawn(self, worker: _PoolProcess) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, worker.kill)
+
+        try:
+            replacement = await loop.run_in_executor(
+                None, _PoolProcess, self._context, self.preload
+            )
+        except Exception as e:
+            logger.error(f"Не вдалося запустити процес пулу замість {worker.pid}: {e}")
+            self._processes.remove(worker)
+            return
+
+        self._processes = [
+            replacement if process is worker else process for process in self._processes
+        ]
+        self._idle.put_nowait(replacement)
+
+
+_pool: Optional[ProcessPool] = None
+
+
+def get_process_pool() -> ProcessPool:
+    global _pool
+
+    if _pool is None:
+        _pool = ProcessPool(
+            size=settings.processing.pool_size,
+            preload=(
+                "services.migration_service",
+                "services.ukrainian_pension_fund",
+                "services.main_service_center_mvs_ukraine",
+            ),
+        )
+    return _pool
+
+
+def discard_result(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _worker_main(conn: Connection, preload: tuple[str, ...]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for module in preload:
+        importlib.import_module(module)
+    conn.send(None)
+
+    while True:
+        try:
+            func, args, context = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        outcome = _execute(func, args, context)
+        try:
+            conn.send(outcome)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            outcome.result = None
+            outcome.error = RuntimeError(f"{type(outcome.error).__name__}: {e}")
+            outcome.error_fields = None
+            conn.send(outcome)
+
+
+def _execute(func: Callable, args: tuple, context: _TaskContext) -> _TaskOutcome:
+    outcome = _TaskOutcome()
+
+    trace = None
+    if context.trace_id is not None or context.memory_profile is not None:
+        trace = Trace(
+            trace_id=context.trace_id or "",
+            sampled=False,
+            parent_id=context.parent_span_id,
+        )
+        trace_token = trace.activate()
+
+    memory_profiler = None
+    if context.memory_profile is not None:
+        memory_profiler = MemoryProfiler.acquire(
+            request=func.__qualname__, **context.memory_profile
+        )
+        if memory_profiler is not None:
+            memory_profiler.start()
+            trace.observers.append(memory_profiler)
+
+    sampling_profiler = None
+    if context.sampling_interval is not None:
+        sampling_profiler = SamplingProfiler(interval=context.sampling_interval)
+        sampling_profiler.__enter__()
+
+    try:
+        outcome.result = func(*args)
+    except Exception as e:
+        outcome.error = e
+        if dataclasses.is_dataclass(e):
+            outcome.error_fields = {
+                error_field.name: getattr(e, error_field.name)
+                for error_field in dataclasses.fields(e)
+            }
+    finally:
+        if sampling_profiler is not None:
+            sampling_profiler.__exit__(None, None, None)
+            outcome.stacks = dict(sampling_profiler.stacks)
+
+        if memory_profiler is not None:
+            trace.observers.remove(memory_profiler)
+            outcome.memory_profile = memory_profiler.stop()
+
+        if trace is not None:
+            trace.deactivate(trace_token)
+            outcome.spans = [finished_span.to_dict() for finished_span in trace.spans]
+
+    return outcome
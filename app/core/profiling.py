@@ -0,0 +1,121 @@
+import functools
+import json
+import logging
+import os
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import settings
+from utils.sampling_profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+_requested_profile: ContextVar[Optional[str]] = ContextVar(
+    "requested_profile", default=None
+)
+_active_profiler: ContextVar[Optional[SamplingProfiler]] = ContextVar(
+    "active_profiler", default=None
+)
+
+
+def request_profile(profile_id: str):
+    return _requested_profile.set(profile_id)
+
+
+def release_profile_request(token) -> None:
+    _requested_profile.reset(token)
+
+
+def current_sampling_profiler() -> Optional[SamplingProfiler]:
+    return _active_profiler.get()
+
+
+def profiled(service: str):
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            profile_id = _requested_profile.get()
+            if profile_id is None:
+                return await func(*args, **kwargs)
+
+            _requested_profile.set(None)
+            profiler = SamplingProfiler(interval=settings.profiling.interval_ms / 1000)
+            token = _active_profiler.set(profiler)
+            try:
+                with profiler:
+                    return await func(*args, **kwargs)
+            finally:
+                _active_profiler.reset(token)
+                save_profile(profile_id, service, profiler)
+
+        return wrapper
+
+    return decorator
+
+
+def save_profile(profile_id: str, service: str, profiler: SamplingProfiler) -> None:
+    storage_dir = settings.profiling.storage_dir
+    metadata = {
+        "id": profile_id,
+        "service": service,
+        "pid": os.getpid(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": profiler.duration,
+        "interval_ms": settings.profiling.interval_ms,
+        "samples": profiler.samples,
+    }
+
+    try:
+        os.makedirs(storage_dir, exist_ok=True)
+        with open(_profile_path(profile_id, ".collapsed"), "w") as file:
+            file.write(profiler.collapsed())
+        with open(_profile_path(profile_id, ".json"), "w") as file:
+            json.dump(metadata, file, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"Не вдалося зберегти профіль '{profile_id}': {e}")
+        return
+
+    _prune_profiles(storage_dir, settings.profiling.max_profiles)
+
+
+def list_profiles() -> list[dict]:
+    storage_dir = settings.profiling.storage_dir
+    if not os.path.isdir(storage_dir):
+        return []
+
+    profiles = []
+    for filename in os.listdir(storage_dir):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(storage_dir, filename)) as file:
+                profiles.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+
+    return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+
+def read_profile(profile_id: str) -> Optional[str]:
+    if not profile_id.isalnum():
+        return None
+
+    try:
+        with open(_profile_path(profile_id, ".collapsed")) as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _profile_path(profile_id: str, suffix: str) -> str:
+    return os.path.join(settings.profiling.storage_dir, f"{profile_id}{suffix}")
+
+
+def _prune_profiles(storage_dir: str, max_profiles: int) -> None:
+    for profile in list_profiles()[max_profiles:]:
+        for suffix in (".json", ".collapsed"):
+            try:
+                os.remove(_profile_path(profile["id"], suffix))
+            except FileNotFoundError:
+                pass
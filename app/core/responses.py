@@ -0,0 +1,61 @@
+import base64
+import json
+from typing import Iterator
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+
+class Base64StreamingJSONResponse(StreamingResponse):
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel,
+        binary_fields: dict[str, bytes],
+        status_code: int = 200,
+    ):
+        head = content.model_dump_json(by_alias=True).encode("utf-8")[:-1]
+        prefixes = self._field_prefixes(head, binary_fields)
+
+        content_length = (
+            len(head)
+            + 1
+            + sum(
+                len(prefix) + 4 * ((len(data) + 2) // 3) + 1
+                for prefix, data in zip(prefixes, binary_fields.values())
+            )
+        )
+
+        super().__init__(
+            self._iter_body(head, prefixes, list(binary_fields.values())),
+            status_code=status_code,
+            headers={"content-length": str(content_length)},
+        )
+
+    @staticmethod
+    def _field_prefixes(head: bytes, binary_fields: dict[str, bytes]) -> list[bytes]:
+        prefixes = []
+        separator = b"," if len(head) > 1 else b""
+        for key in binary_fields:
+            prefixes.append(separator + json.dumps(key).encode("utf-8") + b':"')
+            separator = b","
+        return prefixes
+
+    @staticmethod
+    def _iter_body(
+        head: bytes, prefixes: list[bytes], values: list[bytes]
+    ) -> Iterator[bytes]:
+        pending = head
+        for prefix, data in zip(prefixes, values):
+            pending += prefix
+            view = memoryview(data)
+            for offset in range(0, len(view), BASE64_CHUNK_SIZE):
+                yield pending + base64.b64encode(
+                    view[offset : offset + BASE64_CHUNK_SIZE]
+                )
+                pending = b""
+            pending += b'"'
+        yield pending + b"}"
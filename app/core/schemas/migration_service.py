@@ -1,10 +1,17 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field
 
 from .base import BaseSchema
 
 
+class MigrationServiceImageOptions(BaseSchema):
+    max_width: Optional[int] = Field(default=None, gt=0)
+    max_height: Optional[int] = Field(default=None, gt=0)
+    format: Optional[Literal["jpeg", "webp"]] = None
+    quality: Optional[int] = Field(default=None, ge=1, le=100)
+
+
 class MigrationServiceDocument(BaseSchema):
     number: str
     issued_at: str
@@ -15,7 +22,7 @@ class MigrationServiceDocument(BaseSchema):
     is_last: bool
 
 
-class MigrationServicePersonInfo(BaseSchema):
+class MigrationServicePersonFields(BaseSchema):
     genitive_fullname: str
     translit_fullname: str
     gender: str
@@ -34,5 +41,8 @@ class MigrationServicePersonInfo(BaseSchema):
     image_year: int
     passports: list[MigrationServiceDocument] = Field(default_factory=list)
     foreign_passports: list[MigrationServiceDocument] = Field(default_factory=list)
-    image: str
-    cleaned_file: str
+
+
+class MigrationServicePersonInfo(MigrationServicePersonFields):
+    image: Optional[str] = None
+    cleaned_file: Optional[str] = None
@@ -0,0 +1,313 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from core.config import settings
+from core.exceptions import ProcessingTimeoutException
+from core.metrics import CACHE_REQUESTS
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "single_flight"
+PART_LENGTH_BYTES = 8
+NONE_PART_LENGTH = 2 ** (PART_LENGTH_BYTES * 8) - 1
+
+_in_flight: dict[str, asyncio.Future] = {}
+_last_sweep = 0.0
+_directory: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ResultCodec:
+    encode: Callable[[Any], list[Optional[bytes]]]
+    decode: Callable[[list[Optional[bytes]]], Any]
+
+
+def model_codec(model: type[BaseModel]) -> ResultCodec:
+    return ResultCodec(
+        encode=lambda result: [result.model_dump_json().encode("utf-8")],
+        decode=lambda parts: model.model_validate_json(parts[0]),
+    )
+
+
+def single_flight_key(service: str, *parts: str | bytes) -> str:
+    digest = hashlib.sha256(service.encode("utf-8"))
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+async def single_flight(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    timeout: float,
+    codec: ResultCodec,
+) -> Any:
+    if not settings.single_flight.enabled:
+        return await compute()
+
+    task = _in_flight.get(key)
+    if task is not None:
+        CACHE_REQUESTS.labels(cache=CACHE_NAME, result="joined").inc()
+        with span("single_flight.wait"):
+            return await asyncio.shield(task)
+
+    directory = _shared_directory()
+    if directory is None:
+        task = asyncio.ensure_future(compute())
+    else:
+        task = asyncio.ensure_future(
+            _run_across_workers(directory, key, compute, timeout, codec)
+        )
+    _in_flight[key] = task
+    task.add_done_callback(lambda _: _finish(key, task))
+    return await asyncio.shield(task)
+
+
+async def _run_across_workers(
+    directory: str,
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    timeout: float,
+    codec: ResultCodec,
+) -> Any:
+    config = settings.single_flight
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    if _sweep_due(config.result_ttl):
+        await loop.run_in_executor(None, _sweep, directory, config.result_ttl)
+
+    lock_path = os.path.join(directory, f"{key}.lock")
+    result_path = os.path.join(directory, f"{key}.result")
+    waiter_path = os.path.join(
+        directory, f"{key}.waiter-{os.getpid()}-{os.urandom(4).hex()}"
+    )
+
+    lock = await _acquire(lock_path)
+    if lock is None:
+        with span("single_flight.wait_worker"):
+            lock = await _wait_for_lock(lock_path, waiter_path, deadline, timeout)
+
+    try:
+        result = await loop.run_in_executor(
+            None, _take_result, directory, key, result_path, config.result_ttl, codec
+        )
+        if result is not None:
+            CACHE_REQUESTS.labels(cache=CACHE_NAME, result="shared").inc()
+            return result
+
+        CACHE_REQUESTS.labels(cache=CACHE_NAME, result="miss").inc()
+        result = await compute()
+
+        if await loop.run_in_executor(None, _has_waiters, directory, key):
+            await loop.run_in_executor(None, _write_result, result_path, result, codec)
+        return result
+    finally:
+        _unlock(lock_path, lock)
+
+
+async def _wait_for_lock(
+    lock_path: str, waiter_path: str, deadline: float, timeout: float
+) -> int:
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, _touch, waiter_path)
+    try:
+        lock = None
+        while lock is None:
+            if loop.time() >= deadline:
+                CACHE_REQUESTS.labels(cache=CACHE_NAME, result="timeout").inc()
+                raise ProcessingTimeoutException(timeout_seconds=timeout)
+
+            await asyncio.sleep(settings.single_flight.poll_interval)
+            lock = await _acquire(lock_path)
+        return lock
+    finally:
+        await loop.run_in_executor(None, _remove, waiter_path)
+
+
+async def _acquire(path: str) -> Optional[int]:
+    return await asyncio.get_running_loop().run_in_executor(None, _try_lock, path)
+
+
+def _finish(key: str, task: asyncio.Future) -> None:
+    _in_flight.pop(key, None)
+    if not task.cancelled():
+        task.exception()
+
+
+def _shared_directory() -> Optional[str]:
+    global _directory
+
+    if _directory is None:
+        _directory = _prepare_directory(
+            settings.single_flight.directory
+            or os.path.join(
+                os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+                f"a_parser_single_flight-{os.getuid()}",
+            )
+        )
+    return _directory or None
+
+
+def _prepare_directory(path: str) -> str:
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError as e:
+        logger.error(f"Не вдалося створити каталог single flight '{path}': {e}")
+        return ""
+
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        logger.error(
+            f"Каталог single flight '{path}' має належати поточному користувачу "
+            f"і мати права 0700, обмін результатами між воркерами вимкнено"
+        )
+        return ""
+    return path
+
+
+def _try_lock(path: str) -> Optional[int]:
+    fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        if os.fstat(fd).st_ino == os.stat(path).st_ino:
+            return fd
+    except (BlockingIOError, FileNotFoundError):
+        pass
+
+    os.close(fd)
+    return None
+
+
+def _unlock(path: str, fd: int) -> None:
+    _remove(path)
+    os.close(fd)
+
+
+def _touch(path: str) -> None:
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _has_waiters(directory: str, key: str) -> bool:
+    prefix = f"{key}.waiter-"
+    with os.scandir(directory) as entries:
+        return any(entry.name.startswith(prefix) for entry in entries)
+
+
+def _take_result(
+    directory: str, key: str, path: str, ttl: float, codec: ResultCodec
+) -> Any:
+    result = _read_result(path, ttl, codec)
+    if result is not None and not _has_waiters(directory, key):
+        _remove(path)
+    return result
+
+
+def _read_result(path: str, ttl: float, codec: ResultCodec) -> Any:
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+
+    try:
+        info = os.fstat(fd)
+        if info.st_uid != os.getuid() or time.time() - info.st_mtime > ttl:
+            return None
+        with os.fdopen(fd, "rb") as file:
+            fd = None
+            return codec.decode(_unpack_parts(file.read()))
+    except (OSError, ValueError, ValidationError):
+        return None
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _write_result(path: str, result: Any, codec: ResultCodec) -> None:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        data = _pack_parts(codec.encode(result))
+        fd = os.open(
+            temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | os.O_NOFOLLOW, 0o600
+        )
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Не вдалося зберегти спільний результат '{path}': {e}")
+        _remove(temp_path)
+
+
+def _pack_parts(parts: list[Optional[bytes]]) -> bytes:
+    chunks = []
+    for part in parts:
+        if part is None:
+            chunks.append(NONE_PART_LENGTH.to_bytes(PART_LENGTH_BYTES, "big"))
+        else:
+            chunks.append(len(part).to_bytes(PART_LENGTH_BYTES, "big"))
+            chunks.append(part)
+    return b"".join(chunks)
+
+
+def _unpack_parts(data: bytes) -> list[Optional[bytes]]:
+    parts = []
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        length = int.from_bytes(view[offset : offset + PART_LENGTH_BYTES], "big")
+        offset += PART_LENGTH_BYTES
+        if length == NONE_PART_LENGTH:
+            parts.append(None)
+            continue
+        if offset + length > len(data):
+            raise ValueError("Обрізаний спільний результат")
+        parts.append(bytes(view[offset : offset + length]))
+        offset += length
+    return parts
+
+
+def _sweep_due(ttl: float) -> bool:
+    global _last_sweep
+
+    now = time.time()
+    if now - _last_sweep < ttl:
+        return False
+    _last_sweep = now
+    return True
+
+
+def _sweep(directory: str, ttl: float) -> None:
+    now = time.time()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".lock"):
+                continue
+            try:
+                if now - entry.stat().st_mtime > ttl:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,58 @@
+import logging
+from typing import Literal
+
+import fitz
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    "jpeg": {"jpeg", "jpg"},
+    "webp": {"webp"},
+}
+
+
+class ImageTranscoder:
+    def __init__(
+        self,
+        max_width: int,
+        max_height: int,
+        image_format: Literal["jpeg", "webp"] = "jpeg",
+        quality: int = 80,
+    ):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.image_format = image_format
+        self.quality = quality
+
+    def transcode(self, image_bytes: bytes, image_ext: str) -> tuple[bytes, str]:
+        try:
+            pixmap = fitz.Pixmap(image_bytes)
+            scale = min(
+                self.max_width / pixmap.width, self.max_height / pixmap.height, 1
+            )
+
+            if scale == 1 and image_ext.lower() in FORMAT_EXTENSIONS[self.image_format]:
+                return image_bytes, image_ext
+
+            if pixmap.alpha:
+                pixmap = fitz.Pixmap(pixmap, 0)
+
+            if pixmap.colorspace is not None and pixmap.colorspace.n > 3:
+                pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+
+            if scale < 1:
+                pixmap = fitz.Pixmap(
+                    pixmap,
+                    max(1, round(pixmap.width * scale)),
+                    max(1, round(pixmap.height * scale)),
+                    None,
+                )
+
+            if self.image_format == "webp":
+                return pixmap.pil_tobytes(format="WEBP", quality=self.quality), "webp"
+
+            return pixmap.tobytes("jpeg", jpg_quality=self.quality), "jpeg"
+
+        except Exception as e:
+            logger.error(f"Помилка при перекодуванні зображення: {e}")
+            return image_bytes, image_ext
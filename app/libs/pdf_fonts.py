@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+from utils.decode import decode_text
+
+CMAP_BLOCK_PATTERN = re.compile(
+    rb"begin(codespacerange|bfchar|bfrange)(.*?)end\1", re.DOTALL
+)
+CMAP_TOKEN_PATTERN = re.compile(rb"<([0-9A-Fa-f\s]*)>|\[|\]")
+MAX_BFRANGE_CODES = 0x10000
+MAX_TO_UNICODE_CODES = 0x20000
+UNICODE_LIMIT = 0x110000
+SURROGATE_FIRST = 0xD800
+SURROGATE_LAST = 0xDFFF
+
+
+class ToUnicodeMap:
+    def __init__(
+        self, codespaces: tuple[tuple[bytes, bytes], ...], table: dict[bytes, str]
+    ):
+        self.codespaces = codespaces
+        self.code_widths = tuple(sorted({len(low) for low, _ in codespaces}))
+        self.table = table
+
+    def decode(self, raw: bytes) -> str:
+        if len(self.code_widths) == 1:
+            width = self.code_widths[0]
+            return "".join(
+                self.table.get(raw[idx : idx + width], "")
+                for idx in range(0, len(raw), width)
+            )
+
+        chars = []
+        idx = 0
+        while idx < len(raw):
+            width = self._code_width(raw, idx)
+            chars.append(self.table.get(raw[idx : idx + width], ""))
+            idx += width
+        return "".join(chars)
+
+    def _code_width(self, raw: bytes, idx: int) -> int:
+        for low, high in self.codespaces:
+            code = raw[idx : idx + len(low)]
+            if len(code) == len(low) and all(
+                low_byte <= byte <= high_byte
+                for byte, low_byte, high_byte in zip(code, low, high)
+            ):
+                return len(low)
+        return self.code_widths[0]
+
+
+@lru_cache(maxsize=256)
+def parse_to_unicode_cmap(data: bytes) -> ToUnicodeMap:
+    codespaces = set()
+    table = {}
+
+    for block_type, body in CMAP_BLOCK_PATTERN.findall(data):
+        tokens = _cmap_tokens(body)
+
+        if block_type == b"codespacerange":
+            codespaces.update(
+                (low, high)
+                for low, high in zip(tokens[::2], tokens[1::2])
+                if isinstance(low, bytes)
+                and isinstance(high, bytes)
+                and len(low) == len(high)
+                and low
+            )
+
+        elif block_type == b"bfchar":
+            for src, dst in zip(tokens[::2], tokens[1::2]):
+                table[src] = _utf16(dst)
+
+        else:
+            idx = 0
+            while idx + 2 < len(tokens) and len(table) < MAX_TO_UNICODE_CODES:
+                low, high, dst = tokens[idx : idx + 3]
+                idx += 3
+                table.update(
+                    _bfrange(low, high, dst, MAX_TO_UNICODE_CODES - len(table))
+                )
+
+    if not codespaces:
+        codespaces = {
+            (b"\x00" * width, b"\xff" * width)
+            for width in {len(src) for src in table if src} or {2}
+        }
+    return ToUnicodeMap(
+        codespaces=tuple(sorted(codespaces, key=lambda codespace: len(codespace[0]))),
+        table=table,
+    )
+
+
+class TextDecoder:
+    def __init__(self, fonts: dict[str, Optional[ToUnicodeMap]]):
+        self.fonts = fonts
+        self.font: Optional[ToUnicodeMap] = None
+        self._saved: list[Optional[ToUnicodeMap]] = []
+
+    def apply(self, operands: list, operator: bytes) -> None:
+        if operator == b"Tf" and operands:
+            self.font = self.fonts.get(operands[0])
+        elif operator == b"q":
+            self._saved.append(self.font)
+        elif operator == b"Q" and self._saved:
+            self.font = self._saved.pop()
+
+    def decode(self, operand: Any) -> str:
+        raw = getattr(operand, "original_bytes", None)
+        if self.font is None or raw is None:
+            return decode_text(operand)
+        return self.font.decode(raw)
+
+
+def _cmap_tokens(body: bytes) -> list:
+    tokens = []
+    stack = [tokens]
+
+    for match in CMAP_TOKEN_PATTERN.finditer(body):
+        if match[0] == b"[":
+            stack.append([])
+        elif match[0] == b"]":
+            if len(stack) > 1:
+                array = stack.pop()
+                stack[-1].append(array)
+        else:
+            stack[-1].append(bytes.fromhex(match[1].decode("ascii")))
+
+    return tokens
+
+
+def _bfrange(low: bytes, high: bytes, dst, limit: int) -> dict[bytes, str]:
+    width = len(low)
+    start, end = int.from_bytes(low, "big"), int.from_bytes(high, "big")
+    end = min(end, start + min(MAX_BFRANGE_CODES, limit) - 1)
+
+    if isinstance(dst, list):
+        return {
+            code.to_bytes(width, "big"): _utf16(target)
+            for code, target in zip(range(start, end + 1), dst)
+        }
+
+    text = _utf16(dst)
+    if not text:
+        return {}
+    prefix, base = text[:-1], ord(text[-1])
+    end = min(end, start + UNICODE_LIMIT - 1 - base)
+    return {
+        code.to_bytes(width, "big"): prefix + chr(base + code - start)
+        for code in range(start, end + 1)
+        if not SURROGATE_FIRST <= base + code - start <= SURROGATE_LAST
+    }
+
+
+def _utf16(data) -> str:
+    if not isinstance(data, bytes):
+        return ""
+    return data.decode("utf-16be", errors="ignore")
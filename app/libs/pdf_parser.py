@@ -1,18 +1,33 @@
 import logging
+from dataclasses import dataclass
 from io import BytesIO
 from typing import Optional
 
 import fitz
 import PyPDF4
-from PyPDF4.generic import NameObject, ArrayObject
+from PyPDF4.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+)
 from PyPDF4.pdf import ContentStream
 from PyPDF4.utils import b_
 
-from utils.decode import decode_text
+from libs.pdf_fonts import TextDecoder, ToUnicodeMap, parse_to_unicode_cmap
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class PdfStructure:
+    producer: Optional[str]
+    page_sizes: frozenset[tuple[int, int]]
+    fonts: frozenset[str]
+    xobjects: frozenset[str]
+
+
 class PdfParser:
     def __init__(self, filename: str, content: bytes):
         self.filename = filename
@@ -24,52 +39,122 @@ class PdfParser:
         self.reader = PyPDF4.PdfFileReader(self.buffer)
         self.writer = PyPDF4.PdfFileWriter()
         self.total_pages = self.reader.getNumPages()
+        self._to_unicode_maps: dict[int, Optional[ToUnicodeMap]] = {}
 
-    def text(self) -> str:
+    def text(
+        self, max_pages: Optional[int] = None, exclude: Optional[list[str]] = None
+    ) -> str:
         text_list = []
 
+        pages_count = self.total_pages
+        if max_pages is not None:
+            pages_count = min(pages_count, max_pages)
+
+        with span("pdf.text", pages=pages_count):
+            for page_num in range(pages_count):
+                page = self.reader.getPage(page_num)
+                page_text = self._extract_page_text(page, exclude or [])
+                if page_text:
+                    text_list.append(page_text)
+
+        return "\n".join(text_list)
+
+    def structure(self) -> PdfStructure:
+        info = self.reader.getDocumentInfo() or {}
+        page_sizes, fonts, xobjects = set(), set(), set()
+
         for page_num in range(self.total_pages):
             page = self.reader.getPage(page_num)
-            page_text = self._extract_page_text(page)
-            if page_text:
-                text_list.append(page_text)
+            page_sizes.add(
+                (int(page.mediaBox.getWidth()), int(page.mediaBox.getHeight()))
+            )
 
-        return "\n".join(text_list)
+            resources = page.get("/Resources")
+            if resources is None:
+                continue
+            resources = resources.getObject()
+            if "/Font" in resources:
+                fonts.update(resources["/Font"].getObject().keys())
+            if "/XObject" in resources:
+                xobjects.update(resources["/XObject"].getObject().keys())
+
+        return PdfStructure(
+            producer=info.get("/Producer"),
+            page_sizes=frozenset(page_sizes),
+            fonts=frozenset(fonts),
+            xobjects=frozenset(xobjects),
+        )
+
+    def clean(self, remove_text: list[str], remove_operands: list[str]) -> list[str]:
+        page_texts = []
+
+        with span("pdf.clean", pages=self.total_pages):
+            for page_num in range(self.total_pages):
+                page = self.reader.getPage(page_num)
+
+                if "/Contents" in page:
+                    page_texts.append(
+                        self._clean_page(page, remove_text, remove_operands)
+                    )
+                else:
+                    page_texts.append("")
+                self.writer.addPage(page)
+
+        return page_texts
 
     def remove_text(self, remove_list: list[str]) -> "PdfParser":
         if not remove_list:
             return self
 
-        self._process_pages_for_text_removal(remove_list)
-        self._rebuild_content_after_changes()
+        with span("pdf.remove_text", pages=self.total_pages):
+            self._process_pages_for_text_removal(remove_list)
+            self._rebuild_content_after_changes()
         return self
 
     def remove_by_operands(self, remove_operands: list[str]) -> "PdfParser":
         if not remove_operands:
             return self
 
-        self._process_pages_for_operand_removal(remove_operands)
-        self._rebuild_content_after_changes()
+        with span("pdf.remove_by_operands", pages=self.total_pages):
+            self._process_pages_for_operand_removal(remove_operands)
+            self._rebuild_content_after_changes()
         return self
 
-    def save_to_bytes(self) -> bytes:
+    def save_to_bytes(self, compact: bool = False) -> bytes:
         try:
-            if self.writer.getNumPages() == 0:
-                for page_num in range(self.total_pages):
-                    page = self.reader.getPage(page_num)
-                    self.writer.addPage(page)
+            with span("pdf.save", pages=self.total_pages):
+                if self.writer.getNumPages() == 0:
+                    for page_num in range(self.total_pages):
+                        page = self.reader.getPage(page_num)
+                        self.writer.addPage(page)
 
-            output_buffer = BytesIO()
-            self.writer.write(output_buffer)
-            return output_buffer.getvalue()
+                output_buffer = BytesIO()
+                self.writer.write(output_buffer)
+                content = output_buffer.getvalue()
 
         except Exception as e:
             logger.error(f"Помилка при створенні bytes: {e}")
-            return self.content
+            content = self.content
+
+        if compact:
+            return self.compact(content)
+
+        return content
 
     def get_image_by_index(self, image_index: int) -> Optional[tuple[bytes, str]]:
+        return self.image_by_index(self.content, image_index)
+
+    @staticmethod
+    def image_by_index(content: bytes, image_index: int) -> Optional[tuple[bytes, str]]:
+        with span("pdf.get_image", index=image_index):
+            return PdfParser._get_image_by_index(content, image_index)
+
+    @staticmethod
+    def _get_image_by_index(
+        content: bytes, image_index: int
+    ) -> Optional[tuple[bytes, str]]:
         try:
-            doc = fitz.open("pdf", self.content)
+            doc = fitz.open("pdf", content)
             current_image_count = 0
 
             for page_num in range(len(doc)):
@@ -98,6 +183,19 @@ class PdfParser:
             )
             return None
 
+    @staticmethod
+    def compact(content: bytes) -> bytes:
+        try:
+            with span("pdf.compact", size=len(content)):
+                doc = fitz.open("pdf", content)
+                compacted = doc.tobytes(garbage=4, deflate=True, use_objstms=1)
+                doc.close()
+                return compacted
+
+        except Exception as e:
+            logger.error(f"Помилка при стисненні документа: {e}")
+            return content
+
     def _process_pages_for_operand_removal(self, remove_operands: list[str]):
         for page_num in range(self.total_pages):
             page = self.reader.getPage(page_num)
@@ -126,8 +224,63 @@ class PdfParser:
             )
             page[NameObject("/Contents")] = cleaned_content
 
+        self._remove_xobject_resources(page, remove_operands)
+
         return page
 
+    @staticmethod
+    def _used_xobjects(page) -> Optional[set[str]]:
+        contents = page["/Contents"]
+        if not isinstance(contents, ArrayObject):
+            contents = [contents]
+
+        used = set()
+        for content in contents:
+            if not isinstance(content, ContentStream):
+                return None
+            used.update(
+                operands[0]
+                for operands, operator in content.operations
+                if operator == b_("Do") and operands
+            )
+        return used
+
+    @classmethod
+    def _remove_xobject_resources(cls, page, remove_operands: list[str]):
+        if "/Resources" not in page:
+            return
+
+        resources = page["/Resources"].getObject()
+        if "/XObject" not in resources:
+            return
+
+        used = cls._used_xobjects(page)
+        if used is None:
+            return
+
+        xobjects = resources["/XObject"].getObject()
+        unused = {
+            name for name in remove_operands if name in xobjects and name not in used
+        }
+        if not unused:
+            return
+
+        for name, xobject in xobjects.items():
+            xobject = xobject.getObject()
+            if (
+                name not in unused
+                and xobject.get("/Subtype") == "/Form"
+                and "/Resources" not in xobject
+            ):
+                return
+
+        page_xobjects = DictionaryObject(
+            (name, xobject) for name, xobject in xobjects.items() if name not in unused
+        )
+        page_resources = DictionaryObject(resources)
+        page_resources[NameObject("/XObject")] = page_xobjects
+        page[NameObject("/Resources")] = page_resources
+
     def _process_pages_for_text_removal(self, remove_list: list[str]):
         for page_num in range(self.total_pages):
             page = self.reader.getPage(page_num)
@@ -141,25 +294,99 @@ class PdfParser:
 
     def _remove_text_from_page(self, page, remove_list: list[str]):
         content_object = page["/Contents"].getObject()
+        decoder = self._text_decoder(page)
 
         if isinstance(content_object, ArrayObject):
             new_contents = ArrayObject()
             for content in content_object:
                 cleaned_content = self._clean_content_stream(
-                    content.getObject(), remove_list, "Tj"
+                    content.getObject(), remove_list, "Tj", decoder
                 )
                 new_contents.append(cleaned_content)
             page[NameObject("/Contents")] = new_contents
         else:
             cleaned_content = self._clean_content_stream(
-                content_object, remove_list, "Tj"
+                content_object, remove_list, "Tj", decoder
             )
             page[NameObject("/Contents")] = cleaned_content
 
         return page
 
+    def _clean_page(
+        self, page, remove_text: list[str], remove_operands: list[str]
+    ) -> str:
+        text_list = []
+        content_object = page["/Contents"].getObject()
+        decoder = self._text_decoder(page)
+
+        if isinstance(content_object, ArrayObject):
+            new_contents = ArrayObject()
+            for content in content_object:
+                new_contents.append(
+                    self._filter_content_stream(
+                        content.getObject(),
+                        remove_text,
+                        remove_operands,
+                        text_list,
+                        decoder,
+                    )
+                )
+            page[NameObject("/Contents")] = new_contents
+        else:
+            page[NameObject("/Contents")] = self._filter_content_stream(
+                content_object, remove_text, remove_operands, text_list, decoder
+            )
+
+        self._remove_xobject_resources(page, remove_operands)
+
+        return "\n".join(text_list)
+
+    def _filter_content_stream(
+        self,
+        content_object,
+        remove_text: list[str],
+        remove_operands: list[str],
+        text_list: list[str],
+        decoder: TextDecoder,
+    ):
+        try:
+            content_stream = ContentStream(content_object, self.reader)
+            kept_operations = []
+            stream_text = []
+
+            for operands, operator in content_stream.operations:
+                decoder.apply(operands, operator)
+                if operator == b_("Tj") and operands:
+                    text = decoder.decode(operands[0])
+                    if any(item in text for item in remove_text):
+                        continue
+                    stream_text.append(text)
+                elif operator == b_("TJ") and operands:
+                    stream_text.extend(
+                        decoder.decode(element)
+                        for element in operands[0]
+                        if hasattr(element, "original_bytes")
+                    )
+                elif operator == b_("Do") and operands:
+                    if operands[0] in remove_operands:
+                        continue
+
+                kept_operations.append((operands, operator))
+
+            content_stream.operations = kept_operations
+            text_list.extend(stream_text)
+            return content_stream
+
+        except Exception as e:
+            logger.error(f"Помилка при очищенні потоку контенту: {e}")
+            return content_object
+
     def _clean_content_stream(
-        self, content_object, remove_items: list[str], operator_type: str
+        self,
+        content_object,
+        remove_items: list[str],
+        operator_type: str,
+        decoder: Optional[TextDecoder] = None,
     ):
         try:
             content_stream = ContentStream(content_object, self.reader)
@@ -167,10 +394,12 @@ class PdfParser:
 
             for operands, operator in content_stream.operations:
                 should_remove = False
+                if decoder is not None:
+                    decoder.apply(operands, operator)
 
                 if operator == b_(operator_type) and operands:
                     if operator_type == "Tj":
-                        text = decode_text(operands[0])
+                        text = decoder.decode(operands[0])
                         should_remove = any(item in text for item in remove_items)
                     elif operator_type == "Do":
                         should_remove = operands[0] in remove_items
@@ -185,39 +414,88 @@ class PdfParser:
             logger.error(f"Помилка при очищенні потоку контенту: {e}")
             return content_object
 
-    def _extract_page_text(self, page) -> str:
+    def _extract_page_text(self, page, exclude: list[str]) -> str:
         if "/Contents" not in page:
             return ""
 
         text_list = []
         content_object = page["/Contents"].getObject()
+        decoder = self._text_decoder(page)
 
         if isinstance(content_object, ArrayObject):
             for content in content_object:
-                text_list.extend(self._extract_from_content_stream(content.getObject()))
+                text_list.extend(
+                    self._extract_from_content_stream(
+                        content.getObject(), decoder, exclude
+                    )
+                )
         else:
-            text_list.extend(self._extract_from_content_stream(content_object))
+            text_list.extend(
+                self._extract_from_content_stream(content_object, decoder, exclude)
+            )
 
         return "\n".join(text_list)
 
-    def _extract_from_content_stream(self, content_object) -> list[str]:
+    def _extract_from_content_stream(
+        self, content_object, decoder: TextDecoder, exclude: list[str]
+    ) -> list[str]:
         text_list = []
         try:
             content_stream = ContentStream(content_object, self.reader)
             for operands, operator in content_stream.operations:
+                decoder.apply(operands, operator)
                 if operator == b_("Tj") and operands:
-                    text = decode_text(operands[0])
+                    text = decoder.decode(operands[0])
+                    if any(item in text for item in exclude):
+                        continue
                     text_list.append(text)
                 elif operator == b_("TJ") and operands:
                     for element in operands[0]:
                         if hasattr(element, "original_bytes"):
-                            text = decode_text(element)
+                            text = decoder.decode(element)
                             text_list.append(text)
         except Exception as e:
             logger.error(f"Помилка при обробці потоку контенту: {e}")
 
         return text_list
 
+    def _text_decoder(self, page) -> TextDecoder:
+        fonts = {}
+
+        resources = page.get("/Resources")
+        if resources is not None:
+            resources = resources.getObject()
+            if "/Font" in resources:
+                for name, font in resources["/Font"].getObject().items():
+                    fonts[name] = self._to_unicode_map(font)
+
+        return TextDecoder(fonts)
+
+    def _to_unicode_map(self, font) -> Optional[ToUnicodeMap]:
+        if not isinstance(font, IndirectObject):
+            return self._read_to_unicode_map(font.getObject())
+
+        if font.idnum not in self._to_unicode_maps:
+            self._to_unicode_maps[font.idnum] = self._read_to_unicode_map(
+                font.getObject()
+            )
+        return self._to_unicode_maps[font.idnum]
+
+    @staticmethod
+    def _read_to_unicode_map(font) -> Optional[ToUnicodeMap]:
+        if "/ToUnicode" not in font:
+            return None
+
+        try:
+            to_unicode_map = parse_to_unicode_cmap(
+                font["/ToUnicode"].getObject().getData()
+            )
+        except Exception as e:
+            logger.warning(f"Не вдалося прочитати ToUnicode шрифту: {e}")
+            return None
+
+        return to_unicode_map if to_unicode_map.table else None
+
     def _rebuild_content_after_changes(self):
         temp_buffer = BytesIO()
         self.writer.write(temp_buffer)
@@ -6,6 +6,10 @@ class XlsParser:
     def __init__(self, content: bytes):
         self.df = pd.read_excel(BytesIO(content), sheet_name=0, header=None)
 
+    @property
+    def rows_count(self) -> int:
+        return len(self.df.index)
+
     def cell(self, row: int, col: int) -> str | None:
         try:
             value = self.df.iloc[row, col]
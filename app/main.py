@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
@@ -6,18 +7,49 @@ from fastapi.exceptions import RequestValidationError
 
 from core.config import settings
 
-from api import router as api_router
+from api import router as api_router, upload_rules
 from core.exception_handlers import validation_exception_handler
+from core.metrics import reset_multiprocess_dir
+from core.process_pool import get_process_pool, shutdown_process_pool
+from core.middlewares import (
+    MemoryProfilingMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    TracingMiddleware,
+    UploadValidationMiddleware,
+)
 
 logging.basicConfig(format=settings.logging.log_format)
 
-main_app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.debug.enabled and settings.debug.token is None:
+        logger.warning(
+            "debug.enabled увімкнено без debug.token: профілювання та "
+            "ендпоінти /debug недоступні"
+        )
+    await get_process_pool().start()
+    yield
+    shutdown_process_pool()
+
+
+main_app = FastAPI(lifespan=lifespan)
 
 main_app.exception_handler(RequestValidationError)(validation_exception_handler)
 
+main_app.add_middleware(UploadValidationMiddleware, rules=upload_rules)
+main_app.add_middleware(ProfilingMiddleware, config=settings.profiling)
+main_app.add_middleware(MemoryProfilingMiddleware, config=settings.memory_profiling)
+main_app.add_middleware(TracingMiddleware, config=settings.tracing)
+main_app.add_middleware(MetricsMiddleware)
+
 main_app.include_router(api_router, prefix=settings.api.prefix)
 
 if __name__ == "__main__":
+    reset_multiprocess_dir()
     uvicorn.run(
         "main:main_app", host=settings.run.host, port=settings.run.port, reload=True
     )
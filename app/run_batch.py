@@ -0,0 +1,86 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+if __name__ == "__main__":
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="a_parser_batch_")
+    atexit.register(
+        shutil.rmtree, os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True
+    )
+
+from core.config import settings
+from batch.jobs import JOBS
+from batch.runner import collect_directory_items, read_manifest, run_batch
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="python run_batch.py",
+        description="Пакетна обробка документів без HTTP у пулі процесів",
+    )
+    arg_parser.add_argument("service", choices=JOBS.keys())
+    source = arg_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Каталог з документами")
+    source.add_argument(
+        "--manifest",
+        help="JSONL-маніфест: рядок на документ з полями як у HTTP-запиті "
+        'та необов\'язковим "id"',
+    )
+    arg_parser.add_argument("--results", default="results.jsonl")
+    arg_parser.add_argument("--errors", default="errors.jsonl")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Пропустити документи, які вже є у файлах результатів чи помилок",
+    )
+    arg_parser.add_argument("--max-tasks-per-child", type=int, default=None)
+    arg_parser.add_argument("--progress-interval", type=float, default=10.0)
+    arg_parser.add_argument(
+        "--item-timeout",
+        type=float,
+        default=None,
+        help="Ліміт часу на документ у секундах, за замовчуванням — дедлайн "
+        "ендпоінта з processing.deadlines",
+    )
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(format=settings.logging.log_format, level=logging.INFO)
+
+    job = JOBS[args.service]
+    if args.input:
+        if job.single_file_field is None:
+            arg_parser.error(f"{job.name} приймає кілька файлів, потрібен --manifest")
+        items = collect_directory_items(job, args.input)
+    else:
+        items = read_manifest(job, args.manifest)
+
+    try:
+        stats = run_batch(
+            job,
+            items,
+            results_path=args.results,
+            errors_path=args.errors,
+            workers=args.workers,
+            resume=args.resume,
+            max_tasks_per_child=args.max_tasks_per_child,
+            progress_interval=args.progress_interval,
+            item_timeout=args.item_timeout
+            or getattr(settings.processing.deadlines, job.name),
+        )
+    except KeyboardInterrupt:
+        logger.warning("Обробку перервано, продовжити можна з --resume")
+        sys.exit(130)
+
+    sys.stdout.write(json.dumps(stats.summary(), ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ def main():
             port=settings.run.port,
             workers=settings.run.workers,
             timeout=settings.run.timeout,
+            graceful_timeout=settings.run.graceful_timeout,
+            max_requests=settings.run.max_requests,
+            max_requests_jitter=settings.run.max_requests_jitter,
             log_level=settings.logging.log_level,
         ),
     ).run()
@@ -1,9 +1,15 @@
+import asyncio
 import re
-from typing import Optional
+from typing import Callable, Optional
 
 from fastapi import UploadFile
 
+from core.config import settings
 from core.exceptions import NoFilePresentedException, FileValidationException
+from core.metrics import UPLOAD_SIZE, XLS_ROWS
+from core.process_pool import discard_result, get_process_pool
+from core.profiling import profiled
+from core.single_flight import model_codec, single_flight, single_flight_key
 from core.schemas.main_service_center_mvs_ukraine import (
     MainServiceCenterMVSUkraineDriverLicence,
     MainServiceCenterMVSUkraineCarInfo,
@@ -12,10 +18,16 @@ from core.schemas.main_service_center_mvs_ukraine import (
 )
 from libs.xls_parser import XlsParser
 from utils.text_chain import TextChain
-from utils.validate_file import validate_file
+from utils.tracing import span
+from utils.validate_file import (
+    UploadedFile,
+    validate_file,
+    validate_file_signature,
+)
 
 
 class MainServiceCenterMVSUkraine:
+    @profiled("main_service_center_mvs_ukraine")
     async def process(
         self,
         driver_license_file: Optional[UploadFile],
@@ -24,17 +36,87 @@ class MainServiceCenterMVSUkraine:
         if driver_license_file is None and car_info_file is None:
             raise NoFilePresentedException()
 
+        if driver_license_file:
+            validate_file(driver_license_file, [".xls"], max_size_mb=5)
+
+        if car_info_file:
+            validate_file(car_info_file, [".xls"], max_size_mb=5)
+
+        driver_license_upload, car_info_upload = await asyncio.gather(
+            self._read_upload(driver_license_file, "driver_license"),
+            self._read_upload(car_info_file, "car_info"),
+        )
+
+        return await single_flight(
+            single_flight_key(
+                "main_service_center_mvs_ukraine",
+                *self._upload_key_parts(driver_license_upload),
+                *self._upload_key_parts(car_info_upload),
+            ),
+            lambda: self._process_uploads(driver_license_upload, car_info_upload),
+            timeout=settings.processing.deadlines.main_service_center_mvs_ukraine,
+            codec=model_codec(MainServiceCenterMVSUkrainePersonInfo),
+        )
+
+    async def _process_uploads(
+        self,
+        driver_license_upload: Optional[UploadedFile],
+        car_info_upload: Optional[UploadedFile],
+    ) -> MainServiceCenterMVSUkrainePersonInfo:
+        timeout = settings.processing.deadlines.main_service_center_mvs_ukraine
+        deadline = asyncio.get_running_loop().time() + timeout
+
+        tasks = [
+            asyncio.ensure_future(
+                self._parse_in_pool(
+                    self._parse_driver_license_file,
+                    driver_license_upload,
+                    timeout,
+                    deadline,
+                )
+            ),
+            asyncio.ensure_future(
+                self._parse_in_pool(
+                    self._parse_car_info_file, car_info_upload, timeout, deadline
+                )
+            ),
+        ]
+        try:
+            driver_license, cars = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.add_done_callback(discard_result)
+            raise
+
+        return self._build_person_info(
+            driver_license_upload, driver_license, car_info_upload, cars or []
+        )
+
+    def parse(
+        self,
+        driver_license_file: Optional[UploadedFile],
+        car_info_file: Optional[UploadedFile],
+    ) -> MainServiceCenterMVSUkrainePersonInfo:
         driver_license = None
         cars: list[MainServiceCenterMVSUkraineCarInfo] = []
 
         if driver_license_file:
-            validate_file(driver_license_file, [".xls"], max_size_mb=5)
-            driver_license = await self._parse_driver_license_file(driver_license_file)
+            driver_license = self._parse_driver_license_file(driver_license_file)
 
         if car_info_file:
-            validate_file(car_info_file, [".xls"], max_size_mb=5)
-            cars = await self._parse_car_info_file(car_info_file)
+            cars = self._parse_car_info_file(car_info_file)
+
+        return self._build_person_info(
+            driver_license_file, driver_license, car_info_file, cars
+        )
 
+    @staticmethod
+    def _build_person_info(
+        driver_license_file: Optional[UploadedFile],
+        driver_license: Optional[MainServiceCenterMVSUkraineDriverLicence],
+        car_info_file: Optional[UploadedFile],
+        cars: list[MainServiceCenterMVSUkraineCarInfo],
+    ) -> MainServiceCenterMVSUkrainePersonInfo:
         if car_info_file and driver_license:
             car_full_name = cars[0].full_name
             driver_license_full_name = f"{driver_license.last_name} {driver_license.first_name} {driver_license.patronymic}"
@@ -114,19 +196,57 @@ class MainServiceCenterMVSUkraine:
             cars=processed_cars,
         )
 
-    async def _parse_car_info_file(
-        self, car_info_file: UploadFile
+    @staticmethod
+    def _upload_key_parts(upload: Optional[UploadedFile]) -> tuple[str, bytes]:
+        if upload is None:
+            return "", b""
+        return upload.filename, upload.content
+
+    @staticmethod
+    async def _parse_in_pool(
+        func: Callable,
+        upload: Optional[UploadedFile],
+        timeout: float,
+        deadline: float,
+    ) -> Optional[object]:
+        if upload is None:
+            return None
+
+        return await get_process_pool().run(
+            func, upload, timeout=timeout, deadline=deadline
+        )
+
+    @staticmethod
+    async def _read_upload(
+        file: Optional[UploadFile], document: str
+    ) -> Optional[UploadedFile]:
+        if file is None:
+            return None
+
+        with span(f"{document}.upload_read") as upload_span:
+            content = await file.read()
+            upload_span.set_attribute("file.size", len(content))
+        UPLOAD_SIZE.labels(document=f"{document}_xls").observe(len(content))
+        validate_file_signature(file.filename, content)
+
+        return UploadedFile(filename=file.filename, content=content)
+
+    def _parse_car_info_file(
+        self, car_info_file: UploadedFile
     ) -> list[MainServiceCenterMVSUkraineCarInfo]:
-        content = await car_info_file.read()
-        parser = XlsParser(content)
+        with span("car_info.xls_parsing"):
+            parser = XlsParser(car_info_file.content)
+        XLS_ROWS.labels(document="car_info_xls").observe(parser.rows_count)
 
         first_row = parser.cell(row=0, col=0)
 
         if first_row == "РЕЄСТРАЦІЙНА КАРТКА ТЗ":
-            return self._parse_single_car_info(parser)
+            with span("car_info.field_parsing"):
+                return self._parse_single_car_info(parser)
 
         if first_row == 'Результати аналітичного пошуку ТЗ по "НАІС ДДАІ" МВС України':
-            return self._parse_multi_car_info(parser)
+            with span("car_info.field_parsing"):
+                return self._parse_multi_car_info(parser)
 
         raise FileValidationException(
             filename=car_info_file.filename,
@@ -240,11 +360,12 @@ class MainServiceCenterMVSUkraine:
         ]
 
     @staticmethod
-    async def _parse_driver_license_file(
-        driver_license_file: UploadFile,
+    def _parse_driver_license_file(
+        driver_license_file: UploadedFile,
     ) -> MainServiceCenterMVSUkraineDriverLicence:
-        content = await driver_license_file.read()
-        parser = XlsParser(content)
+        with span("driver_license.xls_parsing"):
+            parser = XlsParser(driver_license_file.content)
+        XLS_ROWS.labels(document="driver_license_xls").observe(parser.rows_count)
 
         if parser.cell(row=0, col=0) != "Результат Пошука ПВ":
             raise FileValidationException(
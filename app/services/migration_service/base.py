@@ -1,53 +1,342 @@
+import asyncio
+import logging
 import re
-import base64
-from datetime import datetime
+from dataclasses import dataclass
 from typing import Optional
 from pydantic import ValidationError
 
 from translitua import translit
 
+from core.config import settings
 from core.exceptions import FileValidationException, ValidationException
+from core.metrics import PDF_PAGES, UPLOAD_SIZE
+from core.process_pool import discard_result, get_process_pool
+from core.profiling import profiled
+from core.single_flight import ResultCodec, single_flight, single_flight_key
 from core.schemas.migration_service import (
-    MigrationServicePersonInfo,
+    MigrationServiceImageOptions,
+    MigrationServicePersonFields,
     MigrationServiceDocument,
 )
+from libs.image_transcoder import ImageTranscoder
 from libs.pdf_parser import PdfParser
 from fastapi import UploadFile, File
 
 from utils.text_chain import TextChain
-from utils.text_parser import parse_field
-from utils.validate_file import validate_file
+from utils.tracing import span
+from utils.validate_file import validate_file, validate_file_signature
+from .layout import LayoutTemplate, extract_layout_document
+from .templates import WATERMARK_TEXTS, WATERMARK_XOBJECTS, find_template_plan
+from .tokenizer import (
+    BIRTH_CERTIFICATES_MARKER,
+    FOREIGN_PASSPORTS_MARKER,
+    PASSPORTS_MARKER,
+    MigrationDocument,
+    scan_document_entries,
+    tokenize_migration_document,
+)
+
+VERIFICATION_PAGES = 1
+
+logger = logging.getLogger(__name__)
+
+
+def _issue_date_key(issued_at: Optional[str]) -> str:
+    if not issued_at:
+        return ""
+    return f"{issued_at[6:]}{issued_at[3:5]}{issued_at[:2]}"
+
+
+@dataclass
+class MigrationServiceResult:
+    person: MigrationServicePersonFields
+    image: Optional[bytes] = None
+    cleaned_file: Optional[bytes] = None
+
+
+MIGRATION_RESULT_CODEC = ResultCodec(
+    encode=lambda result: [
+        result.person.model_dump_json().encode("utf-8"),
+        result.image,
+        result.cleaned_file,
+    ],
+    decode=lambda parts: MigrationServiceResult(
+        person=MigrationServicePersonFields.model_validate_json(parts[0]),
+        image=parts[1],
+        cleaned_file=parts[2],
+    ),
+)
 
 
 class MigrationService:
-    async def process(self, personal_info_file: UploadFile = File(...)) -> any:
+    @profiled("migration_service")
+    async def process(
+        self,
+        personal_info_file: UploadFile = File(...),
+        image_options: Optional[MigrationServiceImageOptions] = None,
+        include_image: bool = True,
+        include_cleaned_file: bool = True,
+    ) -> MigrationServiceResult:
         validate_file(personal_info_file, [".pdf"], max_size_mb=5)
 
-        content = await personal_info_file.read()
+        with span("upload_read") as upload_span:
+            content = await personal_info_file.read()
+            upload_span.set_attribute("file.size", len(content))
+        UPLOAD_SIZE.labels(document="migration_pdf").observe(len(content))
+        validate_file_signature(personal_info_file.filename, content)
+
+        return await single_flight(
+            single_flight_key(
+                "migration_service",
+                personal_info_file.filename,
+                content,
+                image_options.model_dump_json() if image_options else "",
+                f"image={include_image},cleaned_file={include_cleaned_file}",
+            ),
+            lambda: self._process_content(
+                personal_info_file.filename,
+                content,
+                image_options,
+                include_image,
+                include_cleaned_file,
+            ),
+            timeout=settings.processing.deadlines.migration_service,
+            codec=MIGRATION_RESULT_CODEC,
+        )
+
+    async def _process_content(
+        self,
+        filename: str,
+        content: bytes,
+        image_options: Optional[MigrationServiceImageOptions],
+        include_image: bool,
+        include_cleaned_file: bool,
+    ) -> MigrationServiceResult:
+        pool = get_process_pool()
+        timeout = settings.processing.deadlines.migration_service
+        deadline = asyncio.get_running_loop().time() + timeout
+
+        image_task = None
+        branches = []
+        if include_image:
+            image_task = asyncio.ensure_future(
+                pool.run(
+                    self._extract_image,
+                    content,
+                    image_options,
+                    timeout=timeout,
+                    deadline=deadline,
+                )
+            )
+        try:
+            cleaned_file = None
+            if include_cleaned_file:
+                cleaned_file, text, layout = await pool.run(
+                    self._clean,
+                    filename,
+                    content,
+                    timeout=timeout,
+                    deadline=deadline,
+                )
+            else:
+                text, layout = await pool.run(
+                    self._extract_text,
+                    filename,
+                    content,
+                    timeout=timeout,
+                    deadline=deadline,
+                )
 
-        parser = PdfParser(personal_info_file.filename, content)
+            branches.append(
+                asyncio.ensure_future(
+                    pool.run(
+                        self._parse_fields,
+                        content,
+                        text,
+                        layout,
+                        timeout=timeout,
+                        deadline=deadline,
+                    )
+                )
+            )
+            if (
+                cleaned_file is not None
+                and settings.migration_service.compact_cleaned_file
+            ):
+                branches.append(
+                    asyncio.ensure_future(
+                        pool.run(
+                            PdfParser.compact,
+                            cleaned_file,
+                            timeout=timeout,
+                            deadline=deadline,
+                        )
+                    )
+                )
+            person, *compacted = await asyncio.gather(*branches)
+
+            image = await image_task if image_task is not None else None
+        except BaseException:
+            for task in filter(None, [image_task, *branches]):
+                task.add_done_callback(discard_result)
+            raise
 
-        self._verify_file(parser)
+        return MigrationServiceResult(
+            person=person,
+            image=image,
+            cleaned_file=compacted[0] if compacted else cleaned_file,
+        )
 
-        self._remove_water_marks(parser)
+    def parse(
+        self,
+        filename: str,
+        content: bytes,
+        image_options: Optional[MigrationServiceImageOptions] = None,
+        include_image: bool = True,
+        include_cleaned_file: bool = True,
+    ) -> MigrationServiceResult:
+        cleaned_file = None
+        if include_cleaned_file:
+            cleaned_file, text, layout = self._clean(filename, content)
+            if settings.migration_service.compact_cleaned_file:
+                cleaned_file = PdfParser.compact(cleaned_file)
+        else:
+            text, layout = self._extract_text(filename, content)
+
+        return MigrationServiceResult(
+            person=self._parse_fields(content, text, layout),
+            image=(
+                self._extract_image(content, image_options) if include_image else None
+            ),
+            cleaned_file=cleaned_file,
+        )
+
+    def _clean(
+        self, filename: str, content: bytes
+    ) -> tuple[bytes, str, Optional[LayoutTemplate]]:
+        parser = PdfParser(filename, content)
+        PDF_PAGES.labels(document="migration_pdf").observe(parser.total_pages)
+
+        with span("template_fingerprint"):
+            plan = find_template_plan(parser)
+
+        if plan is None:
+            return self._clean_generic(parser)
+
+        with span("verify"):
+            self._verify_text(
+                filename,
+                parser.text(
+                    max_pages=VERIFICATION_PAGES, exclude=list(plan.remove_text)
+                ),
+            )
+
+        with span("watermark_removal", template=plan.name):
+            page_texts = parser.clean(
+                list(plan.remove_text), list(plan.remove_operands)
+            )
+
+        return parser.save_to_bytes(), "\n".join(filter(None, page_texts)), plan.layout
+
+    def _clean_generic(
+        self, parser: PdfParser
+    ) -> tuple[bytes, str, Optional[LayoutTemplate]]:
+        with span("verify"):
+            self._verify_file(parser)
+
+        with span("watermark_removal"):
+            self._remove_water_marks(parser)
+
+        with span("text_extraction"):
+            text = parser.text()
+
+        return parser.save_to_bytes(), text, None
+
+    def _extract_text(
+        self, filename: str, content: bytes
+    ) -> tuple[str, Optional[LayoutTemplate]]:
+        parser = PdfParser(filename, content)
+        PDF_PAGES.labels(document="migration_pdf").observe(parser.total_pages)
+
+        with span("template_fingerprint"):
+            plan = find_template_plan(parser)
+        exclude = list(plan.remove_text if plan is not None else WATERMARK_TEXTS)
+
+        with span("verify"):
+            self._verify_text(
+                filename, parser.text(max_pages=VERIFICATION_PAGES, exclude=exclude)
+            )
+
+        with span("text_extraction"):
+            text = parser.text(exclude=exclude)
+
+        return text, plan.layout if plan is not None else None
+
+    def _parse_fields(
+        self, content: bytes, text: str, layout: Optional[LayoutTemplate]
+    ) -> MigrationServicePersonFields:
+        if layout is None or not settings.migration_service.layout_extraction:
+            return self._parse_text(text)
+
+        with span("layout_extraction", template=layout.name):
+            document = extract_layout_document(content, layout)
+
+        if document is None:
+            logger.warning(
+                f"Не знайдено обов'язкові поля у розмітці шаблону {layout.name}, "
+                f"використано текстовий парсер"
+            )
+            return self._parse_text(text)
+
+        if any(
+            section.started != (section.start_marker in text)
+            for section in document.sections
+        ):
+            logger.warning(
+                f"Розділи у розмітці шаблону {layout.name} не збігаються з текстом, "
+                f"використано текстовий парсер"
+            )
+            return self._parse_text(text)
 
-        clear_text = self._remove_extra_text(parser.text())
+        try:
+            with span("field_parsing"):
+                return self._person_fields(document)
+        except ValidationException as e:
+            logger.warning(
+                f"Поля з розмітки шаблону {layout.name} не пройшли валідацію "
+                f"({e.message}), використано текстовий парсер"
+            )
+            return self._parse_text(text)
 
-        file_text = self._remove_duplicate_rows(clear_text)
+    def _parse_text(self, text: str) -> MigrationServicePersonFields:
+        with span("field_parsing"):
+            return self._person_fields(tokenize_migration_document(text.split("\n")))
 
+    def _person_fields(
+        self, document: MigrationDocument
+    ) -> MigrationServicePersonFields:
         try:
-            person_info = self._parse_person_info(file_text, parser)
+            return MigrationServicePersonFields(**self._parse_person_fields(document))
         except ValidationError as e:
             raise ValidationException.from_pydantic(e)
 
-        return person_info
+    def _extract_image(
+        self,
+        content: bytes,
+        image_options: Optional[MigrationServiceImageOptions],
+    ) -> bytes:
+        with span("image_extraction"):
+            image, _ = self._get_image_transcoder(image_options).transcode(
+                *PdfParser.image_by_index(content, 0)
+            )
+        return image
+
+    def _parse_person_fields(self, document: MigrationDocument) -> dict:
+        fields = document.fields
 
-    def _parse_person_info(
-        self, text: str, parser: PdfParser
-    ) -> MigrationServicePersonInfo:
-        last_name = parse_field(text, "Прізвище", ["Ім`я"])
-        first_name = parse_field(text, "Ім`я", ["По батькові"])
-        patronymic = parse_field(text, "По батькові", ["Дата народження"])
+        last_name = fields.field("Прізвище", ["Ім`я"])
+        first_name = fields.field("Ім`я", ["По батькові"])
+        patronymic = fields.field("По батькові", ["Дата народження"])
         genitive_fullname = (
             TextChain(f"{last_name} {first_name} {patronymic}")
             .capitalize_each_word()
@@ -55,19 +344,19 @@ class MigrationService:
         )
         translit_fullname = self._translit_full_name(last_name, first_name, patronymic)
 
-        gender = parse_field(text, "Стать", ["УНЗР"])
+        gender = fields.field("Стать", ["УНЗР"])
         is_male = gender == "чоловіча"
 
-        phone = parse_field(text, "Телефон", ["Місце народження"])
+        phone = fields.field("Телефон", ["Місце народження"])
         is_phone = bool(phone)
 
-        tax_id = parse_field(text, "РНОКПП", ["Телефон"])
+        tax_id = fields.field("РНОКПП", ["Телефон"])
         is_tax_id = bool(tax_id)
 
-        birth_date = parse_field(text, "Дата народження", ["Стать"])
+        birth_date = fields.field("Дата народження", ["Стать"])
 
         birth_place = (
-            TextChain(parse_field(text, "Місце народження", ["Місце проживання/"]))
+            TextChain(fields.field("Місце народження", ["Місце проживання/"]))
             .clean_whitespace()
             .capitalize_each_word()
             .normalize_address()
@@ -76,13 +365,12 @@ class MigrationService:
 
         registration_place = (
             TextChain(
-                parse_field(
-                    text,
+                fields.field(
                     "перебування",
                     [
-                        "Паспорт громадянина України",
-                        "Свідоцтво про народження",
-                        "Паспорт(и) громадянина України для виїзду за кордон",
+                        PASSPORTS_MARKER,
+                        BIRTH_CERTIFICATES_MARKER,
+                        FOREIGN_PASSPORTS_MARKER,
                     ],
                 )
             )
@@ -92,8 +380,8 @@ class MigrationService:
             .get()
         )
 
-        passports = self._parse_passports(text)
-        foreign_passports = self._parse_foreign_passports(text)
+        passports = self._parse_document_block(document.passports.text)
+        foreign_passports = self._parse_document_block(document.foreign_passports.text)
 
         has_passports = len(passports) > 0
         has_foreign_passports = len(foreign_passports) > 0
@@ -102,11 +390,7 @@ class MigrationService:
 
         image_year = self._get_image_year(passports + foreign_passports)
 
-        image = base64.b64encode(parser.get_image_by_index(0)[0]).decode("utf-8")
-
-        cleaned_file = base64.b64encode(parser.save_to_bytes()).decode("utf-8")
-
-        return MigrationServicePersonInfo(
+        return dict(
             genitive_fullname=genitive_fullname,
             translit_fullname=translit_fullname,
             gender=gender,
@@ -125,8 +409,20 @@ class MigrationService:
             image_year=image_year,
             passports=passports,
             foreign_passports=foreign_passports,
-            image=image,
-            cleaned_file=cleaned_file,
+        )
+
+    @staticmethod
+    def _get_image_transcoder(
+        image_options: Optional[MigrationServiceImageOptions],
+    ) -> ImageTranscoder:
+        defaults = settings.migration_service.image
+        options = image_options or MigrationServiceImageOptions()
+
+        return ImageTranscoder(
+            max_width=options.max_width or defaults.max_width,
+            max_height=options.max_height or defaults.max_height,
+            image_format=options.format or defaults.format,
+            quality=options.quality or defaults.quality,
         )
 
     @staticmethod
@@ -141,113 +437,32 @@ class MigrationService:
 
         return image_year
 
-    def _parse_passports(self, text: str) -> list[MigrationServiceDocument]:
-        return self._parse_document_block(
-            self._extract_block(
-                text=text,
-                start_marker="Паспорт громадянина України",
-                end_markers=[
-                    "Свідоцтво про народження",
-                    "Паспорт(и) громадянина України для виїзду за кордон",
-                ],
-            )
-        )
-
-    def _parse_foreign_passports(self, text: str) -> list[MigrationServiceDocument]:
-        return self._parse_document_block(
-            self._extract_block(
-                text=text,
-                start_marker="Паспорт(и) громадянина України для виїзду за кордон",
-                end_markers=["Свідоцтво про народження", "Паспорт громадянина України"],
-            )
-        )
-
-    @staticmethod
-    def _extract_block(text: str, start_marker: str, end_markers: list[str]) -> str:
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-
-        try:
-            start_index = next(
-                i for i, line in enumerate(lines) if start_marker in line
-            )
-        except StopIteration:
-            return ""
-
-        end_index = next(
-            (
-                i
-                for i, line in enumerate(lines)
-                if i > start_index and any(m in line for m in end_markers)
-            ),
-            -1,
-        )
-
-        slice_end = len(lines) if end_index == -1 else end_index
-        return "\n".join(lines[start_index + 1 : slice_end])
-
     def _parse_document_block(self, block: str) -> list[MigrationServiceDocument]:
-        if not block:
-            return []
-
-        passport_entries = [e for e in re.split(r"(?=Номер)", block) if e.strip()]
-        documents: list[MigrationServiceDocument] = []
-
-        def extract(pattern: str, text: str, flags=0) -> Optional[str]:
-            match = re.search(pattern, text, flags)
-            return match.group(1).strip() if match else None
-
-        for idx, entry in enumerate(passport_entries):
-            number = (
-                TextChain(extract(r"Номер\s*([\wА-ЯЁЄІЇҐ\-]+)", entry, re.IGNORECASE))
-                .normalize_document_number()
-                .get()
+        documents = [
+            MigrationServiceDocument(
+                number=TextChain(entry.number).normalize_document_number().get(),
+                issued_at=entry.issued_at,
+                expires_at=self._normalize_document_expires_at(entry.expires_at),
+                status=entry.status,
+                issuer=entry.issuer,
+                status_bool=bool(entry.status and "Дійсний" in entry.status),
+                is_last=False,
             )
+            for entry in scan_document_entries(block)
+        ]
 
-            issued_at = extract(r"Дата видачі:\s*(\d{2}\.\d{2}\.\d{4})", entry)
-            expires_at = self._normalize_document_expires_at(
-                extract(r"Дійсний до:\s*([^\n]+)", entry)
-            )
-            status = extract(r"Стан документа:\s*([^\n]+)", entry)
-            issuer = extract(r"Орган видачі:\s*([\s\S]+)", entry)
-
-            if issuer:
-                issuer = re.sub(r"\s+", " ", issuer).strip()
-
-            status_bool = True if status and "Дійсний" in status else False
-
-            documents.append(
-                MigrationServiceDocument(
-                    number=number,
-                    issued_at=issued_at,
-                    expires_at=expires_at,
-                    status=status,
-                    issuer=issuer,
-                    status_bool=status_bool,
-                    is_last=False,
-                )
-            )
-
-        def parse_date(date_str: Optional[str]) -> Optional[datetime]:
-            if not date_str:
-                return None
-            try:
-                return datetime.strptime(date_str, "%d.%m.%Y")
-            except ValueError:
-                return None
-
-        documents.sort(
-            key=lambda d: parse_date(d.issued_at) or datetime.min, reverse=True
-        )
+        documents.sort(key=lambda d: _issue_date_key(d.issued_at), reverse=True)
 
         for idx, doc in enumerate(documents):
             doc.is_last = idx == len(documents) - 1
 
         return documents
 
-    @staticmethod
-    def _verify_file(parser: PdfParser) -> None:
-        text = parser.text()
+    def _verify_file(self, parser: PdfParser) -> None:
+        self._verify_text(parser.filename, parser.text(max_pages=VERIFICATION_PAGES))
 
+    @staticmethod
+    def _verify_text(filename: str, text: str) -> None:
         required_phrases = [
             "Державна міграційна служба України",
             "ІНФОРМАЦІЯ ПРО ОСОБУ",
@@ -255,46 +470,14 @@ class MigrationService:
 
         if not all(phrase in text for phrase in required_phrases):
             raise FileValidationException(
-                filename=parser.filename,
+                filename=filename,
                 reason="Не вірний файл. Не знайдено потрібні ключові слова.",
             )
 
     @staticmethod
     def _remove_water_marks(parser: PdfParser) -> None:
-        parser.remove_text(["Користувач "])
-        parser.remove_by_operands(["/I2"])
-
-    @staticmethod
-    def _remove_extra_text(text: str) -> str:
-        data_array = text.split("\n")
-
-        patterns = {"Запит здійснив", "Дата запиту", "Підстава запиту"}
-
-        result = []
-        skip_next = False
-
-        for line in data_array:
-            if skip_next:
-                skip_next = False
-                continue
-
-            if line in patterns:
-                skip_next = True
-                continue
-
-            result.append(line)
-
-        return "\n".join(result)
-
-    @staticmethod
-    def _remove_duplicate_rows(text: str) -> str:
-        lines = text.split("\n")
-        result = [lines[0]]
-        for s in lines[1:]:
-            if s != result[-1]:
-                result.append(s)
-
-        return "\n".join(result)
+        parser.remove_text(list(WATERMARK_TEXTS))
+        parser.remove_by_operands(list(WATERMARK_XOBJECTS))
 
     @staticmethod
     def _translit_full_name(
@@ -309,7 +492,9 @@ class MigrationService:
         return f"{last_name} ({transliterated_last_name}) {formatted_first} ({transliterated_first_name}) {formatted_patronymic}"
 
     @staticmethod
-    def _normalize_document_expires_at(expires_at: str) -> str:
+    def _normalize_document_expires_at(expires_at: Optional[str]) -> str:
+        if expires_at is None:
+            return ""
         if re.fullmatch(r"\d{2}\.\d{2}\.\d{4}", expires_at):
             return f"до {expires_at}"
         return expires_at
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import fitz
+
+from .tokenizer import DocumentSection, MigrationDocument
+
+
+@dataclass(frozen=True)
+class LayoutTemplate:
+    name: str
+    labels: dict[str, str]
+    required_fields: tuple[str, ...]
+    ignore_text: tuple[str, ...] = ()
+    row_tolerance: float = 2.0
+
+
+@dataclass
+class TextRun:
+    page: int
+    baseline: float
+    x0: float
+    line_id: int
+    text: str
+
+
+class LayoutFields:
+    def __init__(self):
+        self.values: dict[str, list[str]] = {}
+
+    def field(self, key: str, next_keys: list[str]) -> str | None:
+        stop_keys = set(next_keys)
+        result_lines = []
+
+        for line in self.values.get(key, ()):
+            if line in stop_keys:
+                break
+            result_lines.append(line)
+
+        return "\n".join(result_lines) if result_lines else None
+
+
+def extract_layout_document(
+    content: bytes, template: LayoutTemplate
+) -> Optional[MigrationDocument]:
+    return build_layout_document(_text_runs(content, template.ignore_text), template)
+
+
+def build_layout_document(
+    runs: list[TextRun], template: LayoutTemplate
+) -> Optional[MigrationDocument]:
+    fields = LayoutFields()
+    document = MigrationDocument(fields=fields)
+
+    current_values: Optional[list[str]] = None
+    current_section: Optional[DocumentSection] = None
+    previous: Optional[TextRun] = None
+
+    for run in _reading_order(runs, template.row_tolerance):
+        label, value = _split_label(run.text, template.labels)
+
+        if label is not None:
+            key = template.labels[label]
+            current_section = None
+            current_values = None
+            if key not in fields.values:
+                current_values = fields.values[key] = []
+            if not value:
+                previous = None
+                continue
+
+        if _is_overdraw(run, value, previous, template.row_tolerance):
+            continue
+
+        if current_section and any(
+            marker in value for marker in current_section.end_markers
+        ):
+            current_section = None
+
+        if current_section is None:
+            section = next(
+                (
+                    section
+                    for section in document.sections
+                    if not section.started and section.start_marker in value
+                ),
+                None,
+            )
+            if section is not None:
+                section.started = True
+                current_section = section
+                current_values = None
+                previous = None
+                continue
+
+        target = current_section.lines if current_section else current_values
+        if target is not None:
+            if target and previous is not None and previous.line_id == run.line_id:
+                target[-1] = f"{target[-1]} {value}"
+            else:
+                target.append(value)
+        run.text = value
+        previous = run
+
+    if not all(fields.values.get(key) for key in template.required_fields):
+        return None
+    return document
+
+
+def _text_runs(content: bytes, ignore_text: tuple[str, ...]) -> list[TextRun]:
+    runs = []
+    line_id = 0
+
+    with fitz.open("pdf", content) as doc:
+        for page_num, page in enumerate(doc):
+            text_page = page.get_text(
+                "dict", flags=fitz.TEXTFLAGS_TEXT, clip=fitz.INFINITE_RECT()
+            )
+            for block in text_page["blocks"]:
+                for line in block.get("lines", ()):
+                    line_id += 1
+                    for text_span in line["spans"]:
+                        text = text_span["text"].strip()
+                        if text and not any(item in text for item in ignore_text):
+                            runs.append(
+                                TextRun(
+                                    page=page_num,
+                                    baseline=text_span["origin"][1],
+                                    x0=text_span["bbox"][0],
+                                    line_id=line_id,
+                                    text=text,
+                                )
+                            )
+
+    return runs
+
+
+def _is_overdraw(
+    run: TextRun, value: str, previous: Optional[TextRun], tolerance: float
+) -> bool:
+    return (
+        previous is not None
+        and value == previous.text
+        and run.page == previous.page
+        and abs(run.baseline - previous.baseline) <= tolerance
+        and abs(run.x0 - previous.x0) <= tolerance
+    )
+
+
+def _reading_order(runs: list[TextRun], row_tolerance: float) -> list[TextRun]:
+    runs.sort(key=lambda run: (run.page, run.baseline, run.x0))
+
+    rows = []
+    row_start: Optional[TextRun] = None
+    for run in runs:
+        if (
+            row_start is None
+            or run.page != row_start.page
+            or run.baseline - row_start.baseline > row_tolerance
+        ):
+            row_start = run
+        rows.append((run.page, row_start.baseline, run.x0, run))
+
+    rows.sort(key=lambda row: row[:3])
+    return [row[3] for row in rows]
+
+
+def _split_label(text: str, labels: dict[str, str]) -> tuple[Optional[str], str]:
+    if text in labels:
+        return text, ""
+
+    for label in labels:
+        if text.startswith(f"{label} "):
+            return label, text[len(label) :].strip()
+    return None, text
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from core.metrics import CACHE_REQUESTS
+from libs.pdf_parser import PdfParser, PdfStructure
+from .layout import LayoutTemplate
+
+WATERMARK_TEXTS = ("Користувач ",)
+WATERMARK_XOBJECTS = ("/I2",)
+
+
+@dataclass(frozen=True)
+class TemplatePlan:
+    name: str
+    remove_text: tuple[str, ...]
+    remove_operands: tuple[str, ...]
+    layout: Optional[LayoutTemplate] = None
+
+
+DMS_REPORT_SERVER_LAYOUT = LayoutTemplate(
+    name="dms_report_server",
+    labels={
+        label: label
+        for label in (
+            "Запит здійснив",
+            "Дата запиту",
+            "Підстава запиту",
+            "Прізвище",
+            "Ім`я",
+            "По батькові",
+            "Дата народження",
+            "Стать",
+            "УНЗР",
+            "РНОКПП",
+            "Телефон",
+            "Місце народження",
+            "Місце проживання/",
+            "перебування",
+        )
+    },
+    required_fields=("Прізвище", "Ім`я", "Дата народження"),
+    ignore_text=WATERMARK_TEXTS,
+)
+
+DMS_REPORT_SERVER_PLAN = TemplatePlan(
+    name="dms_report_server",
+    remove_text=WATERMARK_TEXTS,
+    remove_operands=WATERMARK_XOBJECTS,
+    layout=DMS_REPORT_SERVER_LAYOUT,
+)
+
+# Fingerprints of real DMS reports (PdfParser.structure()) mapped to their
+# plans. Unknown documents take the generic path.
+KNOWN_TEMPLATES: dict[PdfStructure, TemplatePlan] = {}
+
+
+def find_template_plan(parser: PdfParser) -> Optional[TemplatePlan]:
+    if not KNOWN_TEMPLATES:
+        return None
+
+    plan = KNOWN_TEMPLATES.get(parser.structure())
+    CACHE_REQUESTS.labels(
+        cache="pdf_template", result="hit" if plan is not None else "miss"
+    ).inc()
+    return plan
@@ -0,0 +1,142 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from utils.text_parser import LabeledDocument, LabeledFields
+
+PASSPORTS_MARKER = "Паспорт громадянина України"
+FOREIGN_PASSPORTS_MARKER = "Паспорт(и) громадянина України для виїзду за кордон"
+BIRTH_CERTIFICATES_MARKER = "Свідоцтво про народження"
+
+REQUEST_METADATA_LABELS = {"Запит здійснив", "Дата запиту", "Підстава запиту"}
+
+DOCUMENT_ENTRY_MARKER = "Номер"
+DOCUMENT_ENTRY_LABELS = (
+    DOCUMENT_ENTRY_MARKER,
+    "Дата видачі:",
+    "Дійсний до:",
+    "Стан документа:",
+    "Орган видачі:",
+)
+_NOT_LABEL = rf"(?!{'|'.join(re.escape(label) for label in DOCUMENT_ENTRY_LABELS)})"
+_LINE_VALUE = rf"(?:{_NOT_LABEL}[^\n])*"
+DOCUMENT_ENTRY_PATTERN = re.compile(
+    rf"Номер\s*(?P<number>(?:{_NOT_LABEL}[\wА-ЯЁЄІЇҐ\-])*)"
+    rf"|Дата видачі:\s*(?P<issued_at>(?:\d{{2}}\.\d{{2}}\.\d{{4}})?)"
+    rf"|Дійсний до:\s*(?P<expires_at>{_LINE_VALUE})"
+    rf"|Стан документа:\s*(?P<status>{_LINE_VALUE})"
+    rf"|Орган видачі:\s*(?P<issuer>(?:{_NOT_LABEL}[\s\S])*)"
+)
+
+
+@dataclass
+class DocumentSection:
+    start_marker: str
+    end_markers: list[str]
+    lines: list[str] = field(default_factory=list)
+    started: bool = False
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+@dataclass
+class DocumentEntry:
+    number: Optional[str] = None
+    issued_at: Optional[str] = None
+    expires_at: Optional[str] = None
+    status: Optional[str] = None
+    issuer: Optional[str] = None
+
+
+@dataclass
+class MigrationDocument:
+    fields: LabeledFields = field(default_factory=LabeledDocument)
+    passports: DocumentSection = field(
+        default_factory=lambda: DocumentSection(
+            start_marker=PASSPORTS_MARKER,
+            end_markers=[BIRTH_CERTIFICATES_MARKER, FOREIGN_PASSPORTS_MARKER],
+        )
+    )
+    foreign_passports: DocumentSection = field(
+        default_factory=lambda: DocumentSection(
+            start_marker=FOREIGN_PASSPORTS_MARKER,
+            end_markers=[BIRTH_CERTIFICATES_MARKER, PASSPORTS_MARKER],
+        )
+    )
+    birth_certificates: DocumentSection = field(
+        default_factory=lambda: DocumentSection(
+            start_marker=BIRTH_CERTIFICATES_MARKER,
+            end_markers=[PASSPORTS_MARKER, FOREIGN_PASSPORTS_MARKER],
+        )
+    )
+
+    @property
+    def sections(self) -> tuple[DocumentSection, ...]:
+        return self.passports, self.foreign_passports, self.birth_certificates
+
+
+def tokenize_migration_document(lines: Iterable[str]) -> MigrationDocument:
+    fields = LabeledDocument()
+    document = MigrationDocument(fields=fields)
+    current_section: Optional[DocumentSection] = None
+    previous_line: Optional[str] = None
+    skip_next = False
+
+    for line in lines:
+        if skip_next:
+            skip_next = False
+            continue
+
+        if line in REQUEST_METADATA_LABELS:
+            skip_next = True
+            continue
+
+        if line == previous_line:
+            continue
+        previous_line = line
+
+        fields.append(line)
+
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if current_section and any(
+            marker in stripped for marker in current_section.end_markers
+        ):
+            current_section = None
+
+        if current_section:
+            current_section.lines.append(stripped)
+            continue
+
+        for section in document.sections:
+            if not section.started and section.start_marker in stripped:
+                section.started = True
+                current_section = section
+                break
+
+    return document
+
+
+def scan_document_entries(block: str) -> list[DocumentEntry]:
+    entries: list[DocumentEntry] = []
+
+    first_entry = block.find(DOCUMENT_ENTRY_MARKER)
+    if block[: first_entry if first_entry != -1 else len(block)].strip():
+        entries.append(DocumentEntry())
+
+    for match in DOCUMENT_ENTRY_PATTERN.finditer(block):
+        name = match.lastgroup
+        if name == "number":
+            entries.append(DocumentEntry())
+
+        value = match[name].strip()
+        if name == "issuer":
+            value = " ".join(value.split())
+        if value and getattr(entries[-1], name) is None:
+            setattr(entries[-1], name, value)
+
+    return entries
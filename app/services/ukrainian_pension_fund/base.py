@@ -1,31 +1,55 @@
-from datetime import datetime
 from xml.etree.ElementTree import Element
 
+import numpy as np
 from fastapi import UploadFile
 from pydantic import ValidationError
 
+from core.config import settings
 from core.exceptions import ValidationException
+from core.metrics import PAYMENTS, UPLOAD_SIZE
+from core.process_pool import get_process_pool
+from core.profiling import profiled
+from core.single_flight import model_codec, single_flight, single_flight_key
 from core.schemas.ukrainian_pension_fund import (
     UkrainianPensionFundPayment,
     UkrainianPensionFundPersonInfo,
 )
 from utils.text_chain import TextChain
-from utils.validate_file import validate_file
+from utils.tracing import span
+from utils.validate_file import validate_file, validate_file_signature
 import xml.etree.ElementTree as ET
 
 
 class UkrainianPensionFundService:
+    @profiled("ukrainian_pension_fund")
     async def process(
         self, personal_income_file: UploadFile
     ) -> UkrainianPensionFundPersonInfo:
         validate_file(personal_income_file, [".xml", ".XML"], max_size_mb=5)
 
-        content = await personal_income_file.read()
+        with span("upload_read") as upload_span:
+            content = await personal_income_file.read()
+            upload_span.set_attribute("file.size", len(content))
+        UPLOAD_SIZE.labels(document="pension_xml").observe(len(content))
+        validate_file_signature(personal_income_file.filename, content)
+
+        timeout = settings.processing.deadlines.ukrainian_pension_fund
+        return await single_flight(
+            single_flight_key(
+                "ukrainian_pension_fund", personal_income_file.filename, content
+            ),
+            lambda: get_process_pool().run(self.parse, content, timeout=timeout),
+            timeout=timeout,
+            codec=model_codec(UkrainianPensionFundPersonInfo),
+        )
 
-        root = ET.fromstring(content)
+    def parse(self, content: bytes) -> UkrainianPensionFundPersonInfo:
+        with span("xml_parsing"):
+            root = ET.fromstring(content)
 
         try:
-            return self._parse_person_info(root)
+            with span("field_parsing"):
+                return self._parse_person_info(root)
         except ValidationError as e:
             raise ValidationException.from_pydantic(e)
 
@@ -44,7 +68,11 @@ class UkrainianPensionFundService:
 
         payments = self._parse_payments(root)
 
-        ranged_payments = self._process_range_payments(payments)
+        with span("payment_ranges", payments=len(payments)):
+            ranged_payments = self._process_range_payments(payments)
+
+        PAYMENTS.labels(kind="monthly").observe(len(payments))
+        PAYMENTS.labels(kind="ranged").observe(len(ranged_payments))
 
         return UkrainianPensionFundPersonInfo(
             full_name=full_name,
@@ -92,29 +120,45 @@ class UkrainianPensionFundService:
     def _process_range_payments(
         self, payments: list[UkrainianPensionFundPayment]
     ) -> list[UkrainianPensionFundPayment]:
-        sorted_payments = sorted(
-            payments, key=lambda _payment: datetime.strptime(_payment.month, "%d.%m.%Y")
+        if not payments:
+            return []
+
+        insurer_ids: dict[str, int] = {}
+        insurers = np.fromiter(
+            (
+                insurer_ids.setdefault(payment.insurer_name, len(insurer_ids))
+                for payment in payments
+            ),
+            dtype=np.int64,
+            count=len(payments),
         )
+        days, months = self._to_month_indexes(payments)
 
-        grouped_by_insurer: dict[str, list[UkrainianPensionFundPayment]] = {}
-        for payment in sorted_payments:
-            if payment.insurer_name not in grouped_by_insurer:
-                grouped_by_insurer[payment.insurer_name] = []
-            grouped_by_insurer[payment.insurer_name].append(payment)
+        by_date = np.lexsort((days, months))
+        insurers_by_date = insurers[by_date]
+
+        _, first_seen = np.unique(insurers_by_date, return_index=True)
+        insurer_rank = np.empty(len(insurer_ids), dtype=np.int64)
+        insurer_rank[insurers_by_date[np.sort(first_seen)]] = np.arange(len(first_seen))
+
+        order = by_date[np.argsort(insurer_rank[insurers_by_date], kind="stable")]
+        periods = self._find_consecutive_periods(
+            insurers[order], months[order], days[order]
+        )
 
         new_payments: list[UkrainianPensionFundPayment] = []
 
-        for insurer_name, payments in grouped_by_insurer.items():
-            periods = self._find_consecutive_periods(payments)
+        for insurer_periods in periods:
+            first_payment = payments[order[insurer_periods[0, 0]]]
 
             periods_text_list = []
 
-            for period in periods:
-                if len(period) == 1:
-                    periods_text_list.append(period[0].month)
+            for start, end in insurer_periods:
+                if start == end:
+                    periods_text_list.append(payments[order[start]].month)
                 else:
-                    start_date = period[0].month
-                    end_date = period[-1].month
+                    start_date = payments[order[start]].month
+                    end_date = payments[order[end]].month
                     periods_text_list.append(f"{start_date} по {end_date}")
 
             periods_text = ", ".join(periods_text_list)
@@ -122,9 +166,9 @@ class UkrainianPensionFundService:
             new_payments.append(
                 UkrainianPensionFundPayment(
                     month=f"з {periods_text}",
-                    insurer_code=payments[0].insurer_code,
-                    insurer_name=insurer_name,
-                    is_insurer_person=payments[0].is_insurer_person,
+                    insurer_code=first_payment.insurer_code,
+                    insurer_name=first_payment.insurer_name,
+                    is_insurer_person=first_payment.is_insurer_person,
                     is_last=False,
                 )
             )
@@ -132,29 +176,36 @@ class UkrainianPensionFundService:
         return new_payments
 
     @staticmethod
-    def _find_consecutive_periods(
+    def _to_month_indexes(
         payments: list[UkrainianPensionFundPayment],
-    ) -> list[list[UkrainianPensionFundPayment]]:
-        if not payments:
-            return []
+    ) -> tuple[np.ndarray, np.ndarray]:
+        days = np.empty(len(payments), dtype=np.int64)
+        months = np.empty(len(payments), dtype=np.int64)
+
+        for idx, payment in enumerate(payments):
+            day, month, year = payment.month.split(".")
+            days[idx] = int(day)
+            months[idx] = int(year) * 12 + int(month) - 1
 
-        periods: list[list[UkrainianPensionFundPayment]] = []
-        current_period: list[UkrainianPensionFundPayment] = [payments[0]]
+        return days, months
 
-        for i in range(1, len(payments)):
-            current_date = datetime.strptime(payments[i].month, "%d.%m.%Y")
-            previous_date = datetime.strptime(payments[i - 1].month, "%d.%m.%Y")
+    @staticmethod
+    def _find_consecutive_periods(
+        insurers: np.ndarray, months: np.ndarray, days: np.ndarray
+    ) -> list[np.ndarray]:
+        if not len(insurers):
+            return []
 
-            if previous_date.month == 12:
-                next_month = previous_date.replace(year=previous_date.year + 1, month=1)
-            else:
-                next_month = previous_date.replace(month=previous_date.month + 1)
+        period_breaks = (
+            (insurers[1:] != insurers[:-1])
+            | (np.diff(months) != 1)
+            | (days[1:] != days[:-1])
+        )
 
-            if current_date == next_month:
-                current_period.append(payments[i])
-            else:
-                periods.append(current_period)
-                current_period = [payments[i]]
+        starts = np.concatenate(([0], np.flatnonzero(period_breaks) + 1))
+        ends = np.concatenate((starts[1:] - 1, [len(insurers) - 1]))
+        periods = np.column_stack((starts, ends))
 
-        periods.append(current_period)
-        return periods
+        period_insurers = insurers[starts]
+        insurer_breaks = np.flatnonzero(period_insurers[1:] != period_insurers[:-1])
+        return np.split(periods, insurer_breaks + 1)
@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import patch
+
+from benchmarks.generators import migration_pdf
+from libs.pdf_parser import PdfParser
+from services.migration_service import MigrationService
+
+from services.migration_service.layout import (
+    LayoutFields,
+    TextRun,
+    build_layout_document,
+    extract_layout_document,
+)
+from services.migration_service.templates import (
+    DMS_REPORT_SERVER_LAYOUT,
+    WATERMARK_TEXTS,
+)
+from services.migration_service.tokenizer import FOREIGN_PASSPORTS_MARKER
+
+
+def runs(*rows: tuple[float, float, str]) -> list[TextRun]:
+    return [
+        TextRun(page=0, baseline=baseline, x0=x0, line_id=idx, text=text)
+        for idx, (baseline, x0, text) in enumerate(rows)
+    ]
+
+
+class BuildLayoutDocumentTest(unittest.TestCase):
+    def test_equal_values_under_different_labels(self):
+        document = build_layout_document(
+            runs(
+                (100, 50, "Прізвище Шевченко"),
+                (112, 50, "Ім`я Іван"),
+                (124, 50, "По батькові Іван"),
+                (136, 50, "Дата народження 01.01.1990"),
+            ),
+            DMS_REPORT_SERVER_LAYOUT,
+        )
+
+        self.assertEqual(document.fields.values["Ім`я"], ["Іван"])
+        self.assertEqual(document.fields.values["По батькові"], ["Іван"])
+
+    def test_overdrawn_run_is_kept_once(self):
+        document = build_layout_document(
+            runs(
+                (100, 50, "Прізвище"),
+                (100, 250, "Шевченко"),
+                (100.5, 250.5, "Шевченко"),
+                (112, 50, "Ім`я"),
+                (112, 250, "Іван"),
+                (124, 50, "Дата народження"),
+                (124, 250, "01.01.1990"),
+            ),
+            DMS_REPORT_SERVER_LAYOUT,
+        )
+
+        self.assertEqual(document.fields.values["Прізвище"], ["Шевченко"])
+
+    def test_section_continues_on_next_page(self):
+        document = build_layout_document(
+            [
+                *runs(
+                    (100, 50, "Прізвище Шевченко"),
+                    (112, 50, "Ім`я Іван"),
+                    (124, 50, "Дата народження 01.01.1990"),
+                    (780, 50, FOREIGN_PASSPORTS_MARKER),
+                    (792, 50, "Номер"),
+                    (792, 250, "FA100000"),
+                ),
+                TextRun(page=1, baseline=50, x0=50, line_id=10, text="Дата видачі:"),
+                TextRun(page=1, baseline=50, x0=250, line_id=11, text="01.01.2000"),
+            ],
+            DMS_REPORT_SERVER_LAYOUT,
+        )
+
+        self.assertEqual(
+            document.foreign_passports.lines,
+            ["Номер", "FA100000", "Дата видачі:", "01.01.2000"],
+        )
+
+    def test_missing_required_field(self):
+        document = build_layout_document(
+            runs((100, 50, "Прізвище Шевченко"), (112, 50, "Ім`я Іван")),
+            DMS_REPORT_SERVER_LAYOUT,
+        )
+
+        self.assertIsNone(document)
+
+    def test_field_stops_at_next_key(self):
+        fields = LayoutFields()
+        fields.values["Місце проживання/"] = ["м. Київ", "перебування", "вул. Хрещатик"]
+
+        self.assertEqual(fields.field("Місце проживання/", ["перебування"]), "м. Київ")
+
+
+class ParseFieldsFallbackTest(unittest.TestCase):
+    def setUp(self):
+        content = migration_pdf(pages=1)
+        self.service = MigrationService()
+        self.content = content
+        self.text = PdfParser("report.pdf", content).text(exclude=list(WATERMARK_TEXTS))
+        self.document = extract_layout_document(content, DMS_REPORT_SERVER_LAYOUT)
+
+    def parse_fields(self, document):
+        with patch(
+            "services.migration_service.base.extract_layout_document",
+            return_value=document,
+        ):
+            return self.service._parse_fields(
+                self.content, self.text, DMS_REPORT_SERVER_LAYOUT
+            )
+
+    def test_text_below_page_edge_is_extracted(self):
+        self.assertEqual(
+            self.service._person_fields(self.document),
+            self.service._parse_text(self.text),
+        )
+
+    def test_cut_off_section_falls_back_to_text(self):
+        del self.document.foreign_passports.lines[-4:]
+
+        self.assertEqual(
+            self.parse_fields(self.document), self.service._parse_text(self.text)
+        )
+
+    def test_missing_section_falls_back_to_text(self):
+        self.document.foreign_passports.started = False
+        self.document.foreign_passports.lines.clear()
+
+        self.assertEqual(
+            self.parse_fields(self.document), self.service._parse_text(self.text)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from libs.pdf_fonts import (
+    MAX_BFRANGE_CODES,
+    MAX_TO_UNICODE_CODES,
+    SURROGATE_FIRST,
+    SURROGATE_LAST,
+    parse_to_unicode_cmap,
+)
+
+
+def cmap(body: bytes) -> bytes:
+    return (
+        b"begincmap\n1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+        + body
+        + b"\nendcmap"
+    )
+
+
+class ParseToUnicodeCmapTest(unittest.TestCase):
+    def test_bfrange_and_bfchar(self):
+        to_unicode = parse_to_unicode_cmap(
+            cmap(
+                b"2 beginbfrange\n<0010> <0012> <0410>\n<0020> <0021> [<0031> <0032>]\n"
+                b"endbfrange\n1 beginbfchar\n<0030> <0456>\nendbfchar"
+            )
+        )
+
+        self.assertEqual(
+            to_unicode.decode(bytes.fromhex("0010001100120020002100300099")),
+            "АБВ12і",
+        )
+
+    def test_wide_bfrange_is_clamped(self):
+        to_unicode = parse_to_unicode_cmap(
+            b"begincmap\n1 begincodespacerange\n<00000000> <FFFFFFFF>\n"
+            b"endcodespacerange\n1 beginbfrange\n<00000000> <FFFFFFFF> <0041>\n"
+            b"endbfrange\nendcmap"
+        )
+
+        self.assertEqual(
+            len(to_unicode.table),
+            MAX_BFRANGE_CODES - (SURROGATE_LAST - SURROGATE_FIRST + 1),
+        )
+        self.assertEqual(to_unicode.decode(bytes.fromhex("00000001")), "B")
+
+    def test_total_codes_are_capped(self):
+        ranges = b"\n".join(
+            b"<%04X0000> <%04XFFFF> <0041>" % (idx, idx) for idx in range(64)
+        )
+        to_unicode = parse_to_unicode_cmap(
+            b"begincmap\n64 beginbfrange\n" + ranges + b"\nendbfrange\nendcmap"
+        )
+
+        self.assertEqual(len(to_unicode.table), MAX_TO_UNICODE_CODES)
+
+    def test_bfrange_stops_at_unicode_limit(self):
+        to_unicode = parse_to_unicode_cmap(
+            cmap(b"1 beginbfrange\n<0000> <00FF> <DBFFDFF0>\nendbfrange")
+        )
+
+        self.assertEqual(len(to_unicode.table), 16)
+        self.assertEqual(to_unicode.decode(bytes.fromhex("000F")), "\U0010ffff")
+
+    def test_bfrange_skips_surrogates(self):
+        to_unicode = parse_to_unicode_cmap(
+            cmap(b"1 beginbfrange\n<0000> <0003> <D7FE>\nendbfrange")
+        )
+
+        self.assertEqual(len(to_unicode.table), 2)
+        self.assertEqual(
+            to_unicode.decode(bytes.fromhex("0000000100020003")), "\ud7fe\ud7ff"
+        )
+
+    def test_code_width_follows_codespace_ranges(self):
+        to_unicode = parse_to_unicode_cmap(
+            b"begincmap\n2 begincodespacerange\n<00> <80>\n<8140> <FFFF>\n"
+            b"endcodespacerange\n2 beginbfchar\n<81> <0041>\n<8141> <0411>\n"
+            b"endbfchar\nendcmap"
+        )
+
+        self.assertEqual(to_unicode.decode(bytes.fromhex("8141")), "Б")
+
+
+if __name__ == "__main__":
+    unittest.main()
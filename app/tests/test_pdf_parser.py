@@ -0,0 +1,31 @@
+import unittest
+from io import BytesIO
+
+import PyPDF4
+
+from benchmarks.generators import migration_pdf
+from libs.pdf_parser import PdfParser
+
+
+def xobject_names(content: bytes) -> list[list[str]]:
+    reader = PyPDF4.PdfFileReader(BytesIO(content))
+    return [sorted(page["/Resources"]["/XObject"].keys()) for page in reader.pages]
+
+
+class RemoveXObjectResourcesTest(unittest.TestCase):
+    def test_removes_unreferenced_resource(self):
+        parser = PdfParser("report.pdf", migration_pdf(pages=1))
+        parser.remove_by_operands(["/I2"])
+
+        self.assertEqual(xobject_names(parser.save_to_bytes()), [["/I1"]])
+
+    def test_keeps_resource_when_stream_was_not_cleaned(self):
+        parser = PdfParser("report.pdf", migration_pdf(pages=1))
+        parser._clean_content_stream = lambda content, *args, **kwargs: content
+        parser.remove_by_operands(["/I2"])
+
+        self.assertEqual(xobject_names(parser.save_to_bytes()), [["/I1", "/I2"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+
+from services.migration_service.base import MigrationService
+from services.migration_service.tokenizer import DocumentEntry, scan_document_entries
+
+
+class ScanDocumentEntriesTest(unittest.TestCase):
+    def test_stacked_entry(self):
+        block = "\n".join(
+            [
+                "Номер",
+                "100000000",
+                "Дата видачі:",
+                "01.02.2000",
+                "Дійсний до:",
+                "01.02.2010",
+                "Стан документа:",
+                "Дійсний",
+                "Орган видачі:",
+                "ДМС УКРАЇНИ",
+                "У М. КИЄВІ",
+            ]
+        )
+
+        self.assertEqual(
+            scan_document_entries(block),
+            [
+                DocumentEntry(
+                    number="100000000",
+                    issued_at="01.02.2000",
+                    expires_at="01.02.2010",
+                    status="Дійсний",
+                    issuer="ДМС УКРАЇНИ У М. КИЄВІ",
+                )
+            ],
+        )
+
+    def test_blank_expiry_keeps_status(self):
+        block = "\n".join(
+            [
+                "Номер 100000000",
+                "Дата видачі: 01.02.2000",
+                "Дійсний до:",
+                "Стан документа: Дійсний",
+                "Орган видачі: 8000",
+            ]
+        )
+
+        self.assertEqual(
+            scan_document_entries(block),
+            [
+                DocumentEntry(
+                    number="100000000",
+                    issued_at="01.02.2000",
+                    status="Дійсний",
+                    issuer="8000",
+                )
+            ],
+        )
+
+    def test_issuer_before_other_fields(self):
+        block = "\n".join(
+            [
+                "Номер FA100000",
+                "Орган видачі: ДМС УКРАЇНИ",
+                "У М. КИЄВІ",
+                "Дата видачі: 01.02.2000",
+                "Дійсний до: 01.02.2010",
+                "Стан документа: Недійсний",
+            ]
+        )
+
+        self.assertEqual(
+            scan_document_entries(block),
+            [
+                DocumentEntry(
+                    number="FA100000",
+                    issued_at="01.02.2000",
+                    expires_at="01.02.2010",
+                    status="Недійсний",
+                    issuer="ДМС УКРАЇНИ У М. КИЄВІ",
+                )
+            ],
+        )
+
+    def test_single_line_entries(self):
+        block = "\n".join(
+            [
+                "Номер 100000000 Дата видачі: 01.02.2000 Дійсний до: 01.02.2010 "
+                "Стан документа: Недійсний Орган видачі: 8000",
+                "Номер 100000001 Дата видачі: 03.04.2010 Дійсний до: 03.04.2020 "
+                "Стан документа: Дійсний Орган видачі: 8001",
+            ]
+        )
+
+        self.assertEqual(
+            scan_document_entries(block),
+            [
+                DocumentEntry(
+                    number="100000000",
+                    issued_at="01.02.2000",
+                    expires_at="01.02.2010",
+                    status="Недійсний",
+                    issuer="8000",
+                ),
+                DocumentEntry(
+                    number="100000001",
+                    issued_at="03.04.2010",
+                    expires_at="03.04.2020",
+                    status="Дійсний",
+                    issuer="8001",
+                ),
+            ],
+        )
+
+
+class ParseDocumentBlockTest(unittest.TestCase):
+    def test_blank_expiry(self):
+        documents = MigrationService()._parse_document_block(
+            "Номер 100000000\nДата видачі: 01.02.2000\nДійсний до:\n"
+            "Стан документа: Дійсний\nОрган видачі: 8000"
+        )
+
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(documents[0].expires_at, "")
+        self.assertEqual(documents[0].status, "Дійсний")
+        self.assertTrue(documents[0].status_bool)
+
+    def test_issuer_before_expiry(self):
+        documents = MigrationService()._parse_document_block(
+            "Номер 100000000\nОрган видачі: 8000\nДата видачі: 01.02.2000\n"
+            "Дійсний до: 01.02.2010\nСтан документа: Дійсний"
+        )
+
+        self.assertEqual(documents[0].expires_at, "до 01.02.2010")
+        self.assertEqual(documents[0].issuer, "8000")
+
+
+if __name__ == "__main__":
+    unittest.main()
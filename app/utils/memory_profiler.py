@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import resource
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from utils.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+_profiling_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+@dataclass
+class _StageFrame:
+    name: str
+    start_bytes: int
+    max_bytes: int
+    snapshot: Optional[tracemalloc.Snapshot]
+    snapshot_cost: int
+
+
+@dataclass
+class MemoryProfiler:
+    request: str
+    top_sites: int = 10
+    traceback_frames: int = 1
+    stages: list[dict] = field(default_factory=list)
+    child_processes: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def acquire(cls, request: str, **options) -> Optional["MemoryProfiler"]:
+        if tracemalloc.is_tracing() or not _profiling_lock.acquire(blocking=False):
+            return None
+        return cls(request=request, **options)
+
+    def start(self) -> None:
+        self._rss_before = _current_rss_bytes()
+        self._frames: list[_StageFrame] = []
+        self._snapshots_bytes = 0
+
+        tracemalloc.start(self.traceback_frames)
+
+        self._frames.append(self._new_frame("request"))
+        self._peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_snapshot_cost = 0
+        self._peak_snapshot_bytes = 0
+
+    def span_started(self, span: Span) -> None:
+        self._frames.append(self._new_frame(span.name))
+
+    def span_finished(self, span: Span) -> None:
+        if len(self._frames) < 2 or self._frames[-1].name != span.name:
+            return
+
+        snapshot, snapshot_cost = self._take_snapshot()
+        current_bytes, _ = self._traced_memory()
+
+        frame = self._frames.pop()
+        parent = self._frames[-1]
+        parent.max_bytes = max(parent.max_bytes, frame.max_bytes)
+
+        self.stages.append(
+            {
+                "name": frame.name,
+                "depth": len(self._frames) - 1,
+                "peak_bytes": frame.max_bytes - frame.start_bytes,
+                "retained_bytes": current_bytes - frame.start_bytes,
+                "top_sites": self._top_sites(snapshot, frame.snapshot),
+            }
+        )
+        frame.snapshot = None
+        self._release_snapshot(frame.snapshot_cost)
+
+        if current_bytes > self._peak_snapshot_bytes:
+            released_cost = self._peak_snapshot_cost
+            self._peak_snapshot = snapshot
+            self._peak_snapshot_cost = snapshot_cost
+            self._peak_snapshot_bytes = current_bytes
+            self._release_snapshot(released_cost)
+        else:
+            del snapshot
+            self._release_snapshot(snapshot_cost)
+
+    def add_child_profile(self, profile: dict) -> None:
+        depth = len(self._frames)
+        for stage in profile["stages"]:
+            self.stages.append(
+                {**stage, "depth": stage["depth"] + depth, "pid": profile["pid"]}
+            )
+
+        self.child_processes.append(
+            {
+                key: profile[key]
+                for key in (
+                    "request",
+                    "pid",
+                    "peak_bytes",
+                    "rss_after_bytes",
+                    "max_rss_bytes",
+                    "top_sites",
+                )
+            }
+        )
+
+    def stop(self) -> dict:
+        try:
+            self._flush_peak()
+            request_frame = self._frames[0]
+            top_sites = self._top_sites(
+                self._peak_snapshot or request_frame.snapshot, request_frame.snapshot
+            )
+        finally:
+            tracemalloc.stop()
+            _profiling_lock.release()
+
+        return {
+            "request": self.request,
+            "pid": os.getpid(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "peak_bytes": request_frame.max_bytes - request_frame.start_bytes,
+            "rss_before_bytes": self._rss_before,
+            "rss_after_bytes": _current_rss_bytes(),
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "top_sites": top_sites,
+            "stages": self.stages,
+            "child_processes": self.child_processes,
+        }
+
+    def _new_frame(self, name: str) -> _StageFrame:
+        snapshot, snapshot_cost = self._take_snapshot()
+        current_bytes, _ = self._traced_memory()
+        return _StageFrame(
+            name=name,
+            start_bytes=current_bytes,
+            max_bytes=current_bytes,
+            snapshot=snapshot,
+            snapshot_cost=snapshot_cost,
+        )
+
+    def _traced_memory(self) -> tuple[int, int]:
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        return (
+            current_bytes - self._snapshots_bytes,
+            peak_bytes - self._snapshots_bytes,
+        )
+
+    def _flush_peak(self) -> None:
+        if self._frames:
+            _, peak_bytes = self._traced_memory()
+            frame = self._frames[-1]
+            frame.max_bytes = max(frame.max_bytes, peak_bytes)
+
+    def _take_snapshot(self) -> tuple[tracemalloc.Snapshot, int]:
+        self._flush_peak()
+
+        before_bytes, _ = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+        snapshot_cost = tracemalloc.get_traced_memory()[0] - before_bytes
+
+        self._snapshots_bytes += snapshot_cost
+        tracemalloc.reset_peak()
+        return snapshot, snapshot_cost
+
+    def _release_snapshot(self, snapshot_cost: int) -> None:
+        self._flush_peak()
+        self._snapshots_bytes -= snapshot_cost
+        tracemalloc.reset_peak()
+
+    def _top_sites(
+        self, snapshot: tracemalloc.Snapshot, base: tracemalloc.Snapshot
+    ) -> list[dict]:
+        return [
+            {
+                "site": " <- ".join(
+                    f"{frame.filename}:{frame.lineno}" for frame in stat.traceback
+                ),
+                "size_bytes": stat.size_diff,
+                "count": stat.count_diff,
+            }
+            for stat in snapshot.compare_to(base, "traceback")[: self.top_sites]
+            if stat.size_diff > 0
+        ]
+
+
+def log_memory_profile(profile: dict) -> None:
+    stages = ", ".join(
+        f"{stage['name']}={stage['peak_bytes'] / 1024:.0f}KiB"
+        for stage in profile["stages"]
+    )
+    logger.info(
+        f"Профіль пам'яті {profile['request']}: "
+        f"пік {profile['peak_bytes'] / 1024:.0f}KiB, "
+        f"RSS {profile['rss_after_bytes'] / 1024 / 1024:.1f}MiB; {stages}; "
+        f"паралельних запитів у процесі: {profile.get('concurrent_requests', 0)}"
+    )
+
+
+def export_memory_profile(path: str, profile: dict) -> None:
+    line = json.dumps(profile, ensure_ascii=False) + "\n"
+    try:
+        with _export_lock, open(path, "a", encoding="utf-8") as file:
+            file.write(line)
+    except OSError as e:
+        logger.warning(f"Не вдалося записати профіль пам'яті у '{path}': {e}")
+
+
+def read_memory_profiles(path: str, limit: int) -> list[dict]:
+    try:
+        with open(path, encoding="utf-8") as file:
+            lines = file.readlines()[-limit:]
+    except FileNotFoundError:
+        return []
+
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
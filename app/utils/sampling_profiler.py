@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started_at
+
+    def merge(self, stacks: dict[str, int]) -> None:
+        self.stacks.update(stacks)
+        self.samples += sum(stacks.values())
+
+    def collapsed(self) -> str:
+        return "\n".join(
+            f"{stack} {count}" for stack, count in sorted(self.stacks.items())
+        )
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            self.stacks[_collapse_stack(frame)] += 1
+            self.samples += 1
+
+
+def _collapse_stack(frame: Optional[FrameType]) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
@@ -1,27 +1,45 @@
-def parse_field(text: str, key: str, next_keys: list[str]) -> str | None:
-    lines = text.split("\n")
+from typing import Iterable, Optional, Protocol
+
+
+class LabeledFields(Protocol):
+    def field(self, key: str, next_keys: list[str]) -> str | None: ...
+
+
+class LabeledDocument:
+    def __init__(self, lines: Optional[Iterable[str]] = None):
+        self.lines: list[str] = []
+        self._label_index: dict[str, int] = {}
 
-    try:
-        key_index = lines.index(key)
-    except ValueError:
-        return None
+        for line in lines or ():
+            self.append(line)
 
-    if key_index + 1 >= len(lines):
-        return None
+    @classmethod
+    def from_text(cls, text: str) -> "LabeledDocument":
+        return cls(text.split("\n"))
 
-    next_line = lines[key_index + 1]
+    def append(self, line: str) -> None:
+        self._label_index.setdefault(line, len(self.lines))
+        self.lines.append(line)
 
-    if next_line in next_keys:
-        return None
+    def field(self, key: str, next_keys: list[str]) -> str | None:
+        key_index = self._label_index.get(key)
 
-    result_lines = []
+        if key_index is None or key_index + 1 >= len(self.lines):
+            return None
 
-    for i in range(key_index + 1, len(lines)):
-        current_line = lines[i]
+        stop_keys = set(next_keys)
+        result_lines = []
 
-        if current_line in next_keys:
-            break
+        for i in range(key_index + 1, len(self.lines)):
+            current_line = self.lines[i]
 
-        result_lines.append(current_line)
+            if current_line in stop_keys:
+                break
 
-    return "\n".join(result_lines) if result_lines else None
+            result_lines.append(current_line)
+
+        return "\n".join(result_lines) if result_lines else None
+
+
+def parse_field(text: str, key: str, next_keys: list[str]) -> str | None:
+    return LabeledDocument.from_text(text).field(key, next_keys)
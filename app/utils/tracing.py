@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_PATTERN = re.compile(
+    r"^00-(?P<trace_id>[0-9a-f]{32})-(?P<parent_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})$"
+)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+_export_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    trace: "Trace"
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    end_ns: int = 0
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        for observer in self.trace.observers:
+            observer.span_started(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        for observer in self.trace.observers:
+            observer.span_finished(self)
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "attributes": self.attributes,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict:
+        otlp_span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                _otlp_attribute(key, value) for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {},
+        }
+        if self.parent_id:
+            otlp_span["parentSpanId"] = self.parent_id
+        return otlp_span
+
+
+class SpanObserver(Protocol):
+    def span_started(self, span: Span) -> None: ...
+
+    def span_finished(self, span: Span) -> None: ...
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    sampled: bool
+    parent_id: Optional[str] = None
+    spans: list[Span] = field(default_factory=list)
+    observers: list[SpanObserver] = field(default_factory=list)
+
+    @classmethod
+    def start(
+        cls,
+        sample_rate: float,
+        traceparent: Optional[str] = None,
+        honor_remote_sampling: bool = False,
+    ) -> "Trace":
+        sampled = sample_rate > 0 and random.random() < sample_rate
+
+        match = TRACEPARENT_PATTERN.match(traceparent or "")
+        if match:
+            if honor_remote_sampling:
+                sampled = int(match["flags"], 16) & 1 == 1
+            return cls(
+                trace_id=match["trace_id"],
+                parent_id=match["parent_id"],
+                sampled=sampled,
+            )
+
+        return cls(trace_id=os.urandom(16).hex(), sampled=sampled)
+
+    @staticmethod
+    def current() -> Optional["Trace"]:
+        return _current_trace.get()
+
+    def activate(self):
+        return _current_trace.set(self)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _current_trace.reset(token)
+
+    def add_spans(self, spans: list[dict]) -> None:
+        self.spans.extend(Span(trace=self, **span_data) for span_data in spans)
+
+    def root_span(self, name: str, **attributes) -> Span:
+        return Span(
+            trace=self,
+            name=name,
+            span_id=os.urandom(8).hex(),
+            parent_id=self.parent_id,
+            kind=SPAN_KIND_SERVER,
+            attributes=attributes,
+        )
+
+    def server_timing(self) -> str:
+        durations: dict[str, float] = {}
+        for finished_span in self.spans:
+            durations[finished_span.name] = (
+                durations.get(finished_span.name, 0) + finished_span.duration_ms
+            )
+
+        return ", ".join(
+            f"{name};dur={duration:.2f}" for name, duration in durations.items()
+        )
+
+    def export(self, path: str, service_name: str, max_bytes: int) -> None:
+        record = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_otlp_attribute("service.name", service_name)]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [
+                                finished_span.to_otlp() for finished_span in self.spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        try:
+            with _export_lock:
+                _rotate_export(path, max_bytes)
+                with open(path, "a", encoding="utf-8") as file:
+                    file.write(line)
+        except OSError as e:
+            logger.warning(f"Не вдалося записати трасування у '{path}': {e}")
+
+
+def _rotate_export(path: str, max_bytes: int) -> None:
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+
+    if size >= max_bytes:
+        os.replace(path, f"{path}.1")
+
+
+def current_span_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.span_id if current is not None else None
+
+
+def span(name: str, **attributes) -> Span | _NoopSpan:
+    trace = _current_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+
+    parent = _current_span.get()
+    return Span(
+        trace=trace,
+        name=name,
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent is not None else trace.parent_id,
+        attributes=attributes,
+    )
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
@@ -1,10 +1,39 @@
 import os
+from dataclasses import dataclass
 from typing import Optional
 
 from fastapi import UploadFile
+from python_multipart.multipart import MultipartParser, parse_options_header
 
 from core.exceptions import FileValidationException
 
+FILE_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    ".pdf": (b"%PDF",),
+    ".xls": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    ".xml": (b"<?xml", b"<"),
+}
+
+TEXT_FILE_EXTENSIONS = {".xml"}
+
+SIGNATURE_PROBE_SIZE = 64
+
+
+@dataclass
+class UploadedFile:
+    filename: str
+    content: bytes
+
+
+@dataclass
+class UploadRule:
+    allowed_extensions: list[str]
+    max_size_mb: float
+    min_size_mb: Optional[float] = None
+
+    @property
+    def max_size_bytes(self) -> int:
+        return int(self.max_size_mb * 1024 * 1024)
+
 
 def validate_file(
     file: UploadFile,
@@ -20,30 +49,145 @@ def validate_file(
         )
 
     if allowed_extensions:
-        file_ext = os.path.splitext(filename)[1].lower()
-        allowed_ext_lower = [ext.lower() for ext in allowed_extensions]
+        validate_file_extension(filename, allowed_extensions)
+
+    if hasattr(file, "size") and file.size is not None:
+        validate_file_size(filename, file.size, max_size_mb, min_size_mb)
+
+
+def validate_file_extension(filename: str, allowed_extensions: list[str]) -> None:
+    file_ext = os.path.splitext(filename)[1].lower()
+    allowed_ext_lower = [ext.lower() for ext in allowed_extensions]
+
+    if file_ext not in allowed_ext_lower:
+        raise FileValidationException(
+            filename=filename,
+            reason=f"Недозволене розширення '{file_ext}'. Дозволені: {', '.join(allowed_extensions)}",
+        )
 
-        if file_ext not in allowed_ext_lower:
+
+def validate_file_size(
+    filename: str,
+    file_size: int,
+    max_size_mb: Optional[float] = None,
+    min_size_mb: Optional[float] = None,
+) -> None:
+    if min_size_mb:
+        min_size_bytes = int(min_size_mb * 1024 * 1024)
+        if file_size < min_size_bytes:
             raise FileValidationException(
                 filename=filename,
-                reason=f"Недозволене розширення '{file_ext}'. Дозволені: {', '.join(allowed_extensions)}",
+                reason=f"Файл занадто малий. Мінімальний розмір: {min_size_mb:.2f} МБ",
             )
 
-    if hasattr(file, "size") and file.size is not None:
-        file_size = file.size
-
-        if min_size_mb:
-            min_size_bytes = int(min_size_mb * 1024 * 1024)
-            if file_size < min_size_bytes:
-                raise FileValidationException(
-                    filename=filename,
-                    reason=f"Файл занадто малий. Мінімальний розмір: {min_size_mb:.2f} МБ",
-                )
-
-        if max_size_mb:
-            max_size_bytes = int(max_size_mb * 1024 * 1024)
-            if file_size > max_size_bytes:
-                raise FileValidationException(
-                    filename=filename,
-                    reason=f"Файл занадто великий. Максимальний розмір: {max_size_mb:.2f} МБ",
-                )
+    if max_size_mb:
+        max_size_bytes = int(max_size_mb * 1024 * 1024)
+        if file_size > max_size_bytes:
+            raise FileValidationException(
+                filename=filename,
+                reason=f"Файл занадто великий. Максимальний розмір: {max_size_mb:.2f} МБ",
+            )
+
+
+def validate_file_signature(filename: str, head: bytes) -> None:
+    file_ext = os.path.splitext(filename)[1].lower()
+    signatures = FILE_SIGNATURES.get(file_ext)
+
+    if not signatures:
+        return
+
+    if file_ext in TEXT_FILE_EXTENSIONS:
+        head = head.removeprefix(b"\xef\xbb\xbf").lstrip()
+
+    if not head.startswith(signatures):
+        raise FileValidationException(
+            filename=filename,
+            reason=f"Вміст файлу не відповідає розширенню '{file_ext}'",
+        )
+
+
+class UploadStreamValidator:
+    def __init__(self, boundary: bytes, rules: dict[str, UploadRule]):
+        self.rules = rules
+        self.parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+        self._on_part_begin()
+
+    def feed(self, chunk: bytes) -> None:
+        self.parser.write(chunk)
+
+    def _on_part_begin(self) -> None:
+        self._header_field = b""
+        self._header_value = b""
+        self._content_disposition = b""
+        self._rule: Optional[UploadRule] = None
+        self._filename: Optional[str] = None
+        self._size = 0
+        self._head = b""
+        self._sniffed = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._content_disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._content_disposition)
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+
+        self._rule = self.rules.get(name)
+        if self._rule is None or filename is None:
+            self._rule = None
+            return
+
+        self._filename = filename.decode("utf-8", errors="replace")
+        if not self._filename:
+            raise FileValidationException(
+                filename="<unknown>", reason="Назва файлу не вказана"
+            )
+
+        validate_file_extension(self._filename, self._rule.allowed_extensions)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._rule is None:
+            return
+
+        self._size += end - start
+        validate_file_size(self._filename, self._size, self._rule.max_size_mb)
+
+        if not self._sniffed:
+            self._head += data[start : min(end, start + SIGNATURE_PROBE_SIZE)]
+            if len(self._head) >= SIGNATURE_PROBE_SIZE:
+                self._sniff()
+
+    def _on_part_end(self) -> None:
+        if self._rule is None:
+            return
+
+        validate_file_size(
+            self._filename, self._size, min_size_mb=self._rule.min_size_mb
+        )
+        if not self._sniffed:
+            self._sniff()
+
+    def _sniff(self) -> None:
+        self._sniffed = True
+        validate_file_signature(self._filename, self._head)